@@ -0,0 +1,74 @@
+// Client-side chart rendering for the dashboard tabs.
+// The server ships the fetched series once (series-store), tab switches never leave the browser.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    automodeler: {
+        renderTab: function (activeTab, series) {
+            var hidden = {display: "none"};
+            var shown = {display: "block"};
+            var graphStyle = {height: "450px"};
+            var empty = {data: [], layout: {}};
+
+            if (!series) {
+                return [empty, hidden, hidden, hidden];
+            }
+            if (activeTab === "tab-4") {
+                return [empty, hidden, shown, hidden];
+            }
+            if (activeTab === "tab-5") {
+                return [empty, hidden, hidden, shown];
+            }
+
+            var years = series.years;
+            var s = series.values;
+            var layout = {
+                paper_bgcolor: "white",
+                plot_bgcolor: "white",
+                font: {color: "#2a3f5f"},
+                xaxis: {gridcolor: "#EBF0F8", type: "category"},
+                yaxis: {gridcolor: "#EBF0F8", zerolinecolor: "#EBF0F8"},
+                legend: {orientation: "h", yanchor: "bottom", y: 1.02, xanchor: "right", x: 1},
+                margin: {l: 40, r: 40, t: 40, b: 40},
+                hovermode: "x unified"
+            };
+            var data = [];
+
+            if (activeTab === "tab-1") {
+                data.push({type: "bar", x: years, y: s["Revenue"], name: "Revenue",
+                           marker: {color: "#2F5597"}, opacity: 0.8});
+                data.push({type: "scatter", x: years, y: s["Net Income"], name: "Net Income",
+                           mode: "lines+markers", line: {color: "#FFC000", width: 3}, yaxis: "y2"});
+                if (series.proj) {
+                    data.push({type: "bar", x: series.proj.years, y: series.proj["Revenue"], name: "Revenue (proj)",
+                               marker: {color: "#2F5597"}, opacity: 0.35});
+                    data.push({type: "scatter", x: series.proj.years, y: series.proj["Net Income"], name: "Net Income (proj)",
+                               mode: "lines+markers", line: {color: "#FFC000", width: 3, dash: "dot"}, yaxis: "y2"});
+                }
+                layout.yaxis = {title: {text: "Revenue"}, showgrid: false};
+                layout.yaxis2 = {title: {text: "Net Income"}, overlaying: "y", side: "right", showgrid: false};
+            } else if (activeTab === "tab-2") {
+                var gross = [], ebit = [], net = [];
+                for (var i = 0; i < years.length; i++) {
+                    var rev = s["Revenue"][i];
+                    gross.push((rev - s["COGS"][i]) / rev);
+                    ebit.push((rev - s["COGS"][i] - s["SG&A"][i] - s["D&A"][i]) / rev);
+                    net.push(s["Net Income"][i] / rev);
+                }
+                data.push({type: "scatter", x: years, y: gross, name: "Gross", line: {color: "#28a745", width: 3}});
+                data.push({type: "scatter", x: years, y: ebit, name: "EBIT", line: {color: "#2F5597", width: 3}});
+                data.push({type: "scatter", x: years, y: net, name: "Net", line: {color: "#17a2b8", width: 3, dash: "dot"}});
+                layout.yaxis = {tickformat: ".1%", title: {text: "Margin"}, gridcolor: "#EBF0F8"};
+            } else if (activeTab === "tab-3") {
+                var fcf = [];
+                for (var j = 0; j < years.length; j++) {
+                    fcf.push(s["Operating Cash Flow"][j] + s["Capex"][j]);
+                }
+                data.push({type: "bar", x: years, y: s["Operating Cash Flow"], name: "OCF", marker: {color: "#28a745"}});
+                data.push({type: "bar", x: years, y: s["Capex"], name: "Capex", marker: {color: "#dc3545"}});
+                data.push({type: "scatter", x: years, y: fcf, name: "FCF", line: {color: "#2F5597", width: 3, dash: "dash"}});
+            }
+
+            return [{data: data, layout: layout}, graphStyle, hidden, hidden];
+        }
+    }
+});
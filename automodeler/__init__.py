@@ -0,0 +1,7 @@
+"""
+AutoModeler - 3-statement model generator.
+
+Modeling core (fetch, normalize, engine, workbook) in model, engine and layout, with
+providers and cache behind it. The Dash dashboard is in app, background generation in
+jobs, and the headless tools in batch, refresh, export and panel.
+"""
@@ -0,0 +1,515 @@
+import dash
+from dash import dcc, html, dash_table, Input, Output, State, ClientsideFunction
+from dash.dash_table.Format import Format, Scheme
+import dash_bootstrap_components as dbc
+import logging
+import os
+import threading
+import uuid
+from flask import Response, request, stream_with_context
+
+from automodeler.cache import DataCache
+from automodeler.engine import BS_ITEMS, IS_ITEMS, model_lines
+from automodeler.export import DATA_FORMATS, stream_pack
+from automodeler.jobs import ACTIVE, make_job_queue
+from automodeler.metrics import arm_profile, metrics, profiled, timed
+from automodeler.model import data_version, fetch_company_data, projected_lines, scenario_bands, workbook_bytes
+from automodeler.scenarios import run_scenarios
+from automodeler.session import make_session_store
+
+"""
+Dashboard - layout, callbacks and the server-side tab renderers.
+create_app() builds a fresh Dash app, nothing is set up at import time.
+Run it with `python 3_statement_model.py` or `gunicorn "automodeler.app:create_app()"`.
+"""
+
+# assets/ (tabs.js, screenshots) sits at the repo root, next to the package
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+# /export runs in the web worker, so it is kept small: bigger packs belong to `python -m automodeler.export`
+EXPORT_MAX_TICKERS = int(os.environ.get('AUTOMODELER_EXPORT_MAX_TICKERS', 10))
+EXPORT_WORKERS = 2
+# Historical periods shown in the Classic Model View, 0 = all
+CLASSIC_WINDOWS = (5, 10, 0)
+CLASSIC_DEFAULT = 10
+STYLESHEETS = [dbc.themes.LITERA, "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"]
+
+def kpi_card(title, value, subtitle, icon, color):
+    return dbc.Card(
+        dbc.CardBody([
+            html.Div([
+                html.Div([
+                    html.H6(title, className="text-muted text-uppercase small mb-1"),
+                    html.H3(value, className="mb-0", style={"color": color})
+                ], className="flex-grow-1"),
+                html.I(className=f"fas {icon} fa-2x", style={"opacity": "0.3", "color": color})
+            ], className="d-flex align-items-center mb-2"),
+            html.Small(subtitle, className="text-muted")
+        ]),
+        className="shadow-sm border-0 mb-4"
+    )
+
+sidebar = html.Div([
+    html.Div([
+        html.I(className="fas fa-chart-line fa-lg me-2 text-primary"),
+        html.H4("AutoModeler", className="d-inline align-middle fw-bold text-primary")
+    ], className="mb-5 text-center"),
+    
+    html.Label("Ticker", className="fw-bold text-muted small mb-2"),
+    dbc.Input(id="ticker-input", placeholder="AAPL, MSFT...", type="text", className="mb-3 form-control-lg"),
+    
+    dbc.Button([html.I(className="fas fa-magic me-2"), "Generate"], 
+               id="btn-generate", color="primary", size="lg", className="w-100 mb-3 shadow"),
+    dbc.Button([html.I(className="fas fa-file-excel me-2"), "Download Excel"],
+               id="btn-download", color="success", outline=True, className="w-100 mb-3"),
+    dbc.Switch(id="scenario-switch", label="Add scenario sheet to Excel", value=False, className="small mb-3"),
+
+    # Progress of the background generation job, hidden when idle
+    html.Div(id="job-status", style={"display": "none"}, children=[
+        html.Small(id="job-stage", className="text-muted"),
+        dbc.Progress(id="job-progress", value=0, striped=True, animated=True, className="mt-1 mb-2"),
+        dbc.Button("Cancel", id="btn-cancel", color="secondary", outline=True, size="sm", className="w-100 mb-3"),
+    ]),
+    
+    html.Div(id="status-alert-container"),
+    html.Hr(),
+    html.Small("3-Statement financial model generator.", className="text-muted fst-italic")
+], style={
+    "position": "fixed", "top": 0, "left": 0, "bottom": 0, "width": "300px",
+    "padding": "2rem", "backgroundColor": "#f8f9fa", "borderRight": "1px solid #dee2e6"
+})
+
+content = html.Div([
+    dbc.Row([
+        dbc.Col([
+            html.H2(id="company-name", children="Financial Model", className="fw-bold mb-0"),
+            html.Span(id="company-meta", children="Enter a ticker", className="text-muted")
+        ])
+    ], className="mb-4 align-items-center"),
+
+    dcc.Loading(id="loader", type="cube", color="#2F5597", children=[
+        dbc.Row(id="kpi-row", className="mb-2"),
+        
+        dbc.Card([
+            dbc.CardHeader([
+                dbc.Tabs([
+                    dbc.Tab(label="Historical Performance", tab_id="tab-1"),
+                    dbc.Tab(label="Margin Analysis", tab_id="tab-2"),
+                    dbc.Tab(label="Cash Flow", tab_id="tab-3"),
+                    dbc.Tab(label="Classic Model View", tab_id="tab-4"),
+                    dbc.Tab(label="Scenarios", tab_id="tab-5"),
+                ], id="tabs", active_tab="tab-1", className="card-tabs")
+            ], className="bg-transparent border-bottom-0"),
+            dbc.CardBody([
+                # Charts are drawn in the browser (assets/tabs.js), the two table tabs come from the server
+                html.Div(id="tab-content", style={"overflowX": "auto"}, children=[
+                    dcc.Graph(id="tab-graph", config={'displayModeBar': False}, style={"display": "none"}),
+                    html.Div(id="classic-view", style={"display": "none"}, children=[
+                        dbc.RadioItems(id="classic-window", value=CLASSIC_DEFAULT, inline=True, className="small mb-2",
+                                       options=[{"label": f"Last {n} periods" if n else "All periods", "value": n}
+                                                for n in CLASSIC_WINDOWS]),
+                        html.Div(id="classic-table-wrap"),
+                    ]),
+                    html.Div(id="scenario-view", style={"display": "none"}),
+                ])
+            ])
+        ], className="shadow-sm border-0 mb-4"),
+    ]),
+    
+    dcc.Store(id="series-store"),
+    dcc.Store(id="job-id"),
+    dcc.Store(id="job-result"),
+    # Download asked for a ticker that still had to be generated
+    dcc.Store(id="pending-download"),
+    dcc.Interval(id="job-poll", interval=500, disabled=True),
+    dcc.Download(id="download-excel")
+    
+], style={"marginLeft": "300px", "padding": "2rem"})
+
+def serve_layout():
+    # Layout is a function so every page load gets its own session id
+    return html.Div([dcc.Store(id="session-id", data=str(uuid.uuid4())), sidebar, content])
+
+def series_payload(df, proj):
+    """Compact chart data for the browser, one list per line item"""
+    cols = ['Revenue', 'COGS', 'SG&A', 'D&A', 'Net Income', 'Operating Cash Flow', 'Capex']
+    return {
+        'years': list(df.index.strftime('%Y')),
+        'values': {c: df[c].tolist() for c in cols},
+        'proj': {'years': list(proj.index), 'Revenue': proj['Revenue'].tolist(), 'Net Income': proj['Net Income'].tolist()},
+    }
+
+def create_app():
+    """Build the Dash app with its own session store and tab cache"""
+    # Stage timings are logged as JSON lines, AUTOMODELER_LOG_LEVEL=WARNING silences them
+    logging.basicConfig(level=os.environ.get('AUTOMODELER_LOG_LEVEL', 'INFO'), format='%(message)s')
+
+    app = dash.Dash(__name__, assets_folder=ASSETS, external_stylesheets=STYLESHEETS)
+    app.layout = serve_layout
+
+    # Per-session state, AUTOMODELER_SESSION_BACKEND=sqlite shares it across workers
+    sessions = make_session_store()
+    # Fetches, projections, scenarios and workbooks run in job processes, not in the web worker
+    jobs = make_job_queue()
+
+    # One /export at a time per web worker, the others get a 429
+    export_slot = threading.BoundedSemaphore(1)
+
+    # Built tab components per (ticker, data version, tab)
+    tab_cache = DataCache(store=None, ttl=60 * 60, max_memory=512)
+    metrics.register('tab_cache', tab_cache.stats)
+
+    @app.server.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    @app.server.route("/debug/profile", methods=["POST"])
+    def profile_next_request():
+        # Only works when AUTOMODELER_PROFILE_DIR is set
+        if not arm_profile():
+            return Response("profiling disabled\n", status=404, mimetype="text/plain")
+        return Response("next dashboard or download request will be profiled\n", mimetype="text/plain")
+
+    @app.server.route("/export")
+    def export_models():
+        # /export?tickers=AAPL,MSFT&data=csv&scenarios=1 streams a zip as each model finishes
+        tickers = []
+        for t in request.args.get('tickers', '').upper().split(','):
+            if t.strip() and t.strip() not in tickers:
+                tickers.append(t.strip())
+        data_format = request.args.get('data') or None
+        if not tickers or len(tickers) > EXPORT_MAX_TICKERS:
+            return Response(f"give 1-{EXPORT_MAX_TICKERS} comma separated tickers\n", status=400, mimetype="text/plain")
+        if data_format not in (None,) + DATA_FORMATS:
+            return Response(f"data must be one of {', '.join(DATA_FORMATS)}\n", status=400, mimetype="text/plain")
+        try:
+            # A missing parquet engine raises here, a 400 rather than a broken download
+            chunks = stream_pack(tickers, workers=EXPORT_WORKERS, scenarios=request.args.get('scenarios') == '1',
+                                 data_format=data_format)
+        except ValueError as e:
+            return Response(f"{e}\n", status=400, mimetype="text/plain")
+        if not export_slot.acquire(blocking=False):
+            return Response("another export is running, try again shortly\n", status=429, mimetype="text/plain")
+
+        name = tickers[0] if len(tickers) == 1 else f"{len(tickers)}_tickers"
+        response = Response(stream_with_context(chunks), mimetype="application/zip",
+                            headers={"Content-Disposition": f'attachment; filename="{name}_Models.zip"'})
+        # Runs when the server closes the response: finished, failed or client gone
+        response.call_on_close(export_slot.release)
+        return response
+
+    def tab_content_cached(ticker, version, active_tab, df, meta, lines=None, window=None, bands=None):
+        key = (ticker, version, active_tab, window)
+        content = tab_cache.get(key)
+        if content is None:
+            with timed('figure_build', tab=active_tab, ticker=ticker):
+                content = build_tab_content(active_tab, df, meta, lines, window, bands)
+            tab_cache.set(key, content)
+        return content
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="automodeler", function_name="renderTab"),
+        [Output("tab-graph", "figure"),
+         Output("tab-graph", "style"),
+         Output("classic-view", "style"),
+         Output("scenario-view", "style")],
+        [Input("tabs", "active_tab"),
+         Input("series-store", "data")]
+    )
+
+    @app.callback(
+        [Output("job-id", "data"),
+         Output("job-poll", "disabled"),
+         Output("job-status", "style"),
+         Output("job-stage", "children"),
+         Output("job-progress", "value"),
+         Output("job-result", "data", allow_duplicate=True),
+         Output("pending-download", "data", allow_duplicate=True)],
+        Input("btn-generate", "n_clicks"),
+        State("ticker-input", "value"),
+        prevent_initial_call=True
+    )
+    def submit_job(n_clicks, ticker):
+        if not ticker:
+            return None, True, {"display": "none"}, "", 0, {"id": None, "status": "empty"}, None
+        ticker = ticker.upper()
+        job_id = jobs.submit(ticker)
+        return job_id, False, {"display": "block"}, f"{ticker}: queued...", 0, dash.no_update, None
+
+    @app.callback(
+        [Output("job-stage", "children", allow_duplicate=True),
+         Output("job-progress", "value", allow_duplicate=True),
+         Output("job-status", "style", allow_duplicate=True),
+         Output("job-poll", "disabled", allow_duplicate=True),
+         Output("job-result", "data")],
+        Input("job-poll", "n_intervals"),
+        State("job-id", "data"),
+        prevent_initial_call=True
+    )
+    def poll_job(n_intervals, job_id):
+        job = jobs.store.get(job_id) if job_id else None
+        if job is None:
+            return "", 0, {"display": "none"}, True, {"id": job_id, "status": "failed", "error": "Job not found"}
+        if job["status"] in ACTIVE:
+            stage = "cancelling" if job["cancel_requested"] else job["stage"]
+            return f"{job['ticker']}: {stage}...", job["progress"] * 100, dash.no_update, False, dash.no_update
+        result = {"id": job_id, "status": job["status"], "ticker": job["ticker"], "error": job["error"]}
+        return "", 0, {"display": "none"}, True, result
+
+    @app.callback(
+        Output("job-stage", "children", allow_duplicate=True),
+        Input("btn-cancel", "n_clicks"),
+        State("job-id", "data"),
+        prevent_initial_call=True
+    )
+    def cancel_job(n_clicks, job_id):
+        if not job_id:
+            return dash.no_update
+        jobs.cancel(job_id)
+        return "Cancelling..."
+
+    @app.callback(
+        [Output("series-store", "data"),
+         Output("classic-table-wrap", "children"),
+         Output("scenario-view", "children"),
+         Output("kpi-row", "children"),
+         Output("company-name", "children"),
+         Output("company-meta", "children"),
+         Output("status-alert-container", "children")],
+        Input("job-result", "data"),
+        [State("session-id", "data"),
+         State("classic-window", "value")],
+        prevent_initial_call=True
+    )
+    @profiled('dashboard')
+    @timed('dashboard')
+    def update_dashboard(job, session_id, window):
+        if not job or job["status"] == "empty":
+            return None, None, None, [], "Financial Dashboard", "Enter a ticker", []
+        if job["status"] == "cancelled":
+            alert = dbc.Alert([html.I(className="fas fa-ban me-2"), "Generation cancelled"], color="secondary", dismissable=True)
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update, alert
+        if job["status"] != "done":
+            alert = dbc.Alert([html.I(className="fas fa-exclamation-circle me-2"), job["error"]], color="danger", dismissable=True)
+            return None, None, None, [], "Error", "Failed", alert
+        ticker = job["ticker"]
+
+        try:
+            # The job has filled the shared data cache, so this is a cache hit
+            try:
+                df, meta = fetch_company_data(ticker)
+            except Exception as e:
+                alert = dbc.Alert([html.I(className="fas fa-exclamation-circle me-2"), str(e)], color="danger", dismissable=True)
+                return None, None, None, [], "Error", "Failed", alert
+        
+            # Every Model sheet line once, shared by the charts and the classic view (built by the job)
+            lines = projected_lines(df, meta)
+            proj = lines.iloc[len(df):]
+            if session_id:
+                sessions.set(session_id, {'ticker': ticker, 'df': df, 'meta': meta, 'lines': lines})
+        
+            latest = df.iloc[-1]
+            prev = df.iloc[-2] if len(df) > 1 else latest
+        
+            def fmt_money(x): 
+                return f"${x/1e9:.1f}B" if x > 1e9 else f"${x/1e6:.0f}M"
+        
+            rev_growth = (latest['Revenue'] - prev['Revenue']) / prev['Revenue'] if prev['Revenue'] else 0
+            net_margin = latest['Net Income'] / latest['Revenue'] if latest['Revenue'] else 0
+            d2e = latest['Debt'] / latest['Total Equity'] if latest['Total Equity'] else 0
+        
+            kpis = [
+                dbc.Col(kpi_card("Revenue", fmt_money(latest['Revenue']), f"{rev_growth:+.1%} YoY", "fa-coins", "#2F5597"), width=3),
+                dbc.Col(kpi_card("Net Income", fmt_money(latest['Net Income']), f"{net_margin:.1%} margin", "fa-chart-pie", "#28a745"), width=3),
+                dbc.Col(kpi_card("Cash", fmt_money(latest['Cash']), "On hand", "fa-wallet", "#17a2b8"), width=3),
+                dbc.Col(kpi_card("Debt", fmt_money(latest['Debt']), f"{d2e:.2f}x D/E", "fa-file-invoice-dollar", "#dc3545"), width=3),
+            ]
+        
+            version = data_version(df, meta)
+            classic = tab_content_cached(ticker, version, "tab-4", df, meta, lines, window)
+            scenario = tab_content_cached(ticker, version, "tab-5", df, meta, bands=scenario_bands(df, meta))
+
+            return (series_payload(df, proj), classic, scenario, kpis,
+                    f"{meta['name']} ({ticker})", f"{meta['sector']} | {meta['industry']}", [])
+
+        except Exception as e:
+            alert = dbc.Alert([html.I(className="fas fa-bug me-2"), str(e)], color="danger", dismissable=True)
+            return None, None, None, [], "Error", "Processing failed", alert
+
+    @app.callback(
+        Output("classic-table-wrap", "children", allow_duplicate=True),
+        Input("classic-window", "value"),
+        State("session-id", "data"),
+        prevent_initial_call=True
+    )
+    def update_classic_window(window, session_id):
+        state = sessions.get(session_id) if session_id else None
+        if not state:
+            return dash.no_update
+        version = data_version(state['df'], state['meta'])
+        return tab_content_cached(state['ticker'], version, "tab-4", state['df'], state['meta'],
+                                  state['lines'], window)
+
+    @app.callback(
+        [Output("download-excel", "data"),
+         Output("status-alert-container", "children", allow_duplicate=True),
+         Output("job-id", "data", allow_duplicate=True),
+         Output("job-poll", "disabled", allow_duplicate=True),
+         Output("job-status", "style", allow_duplicate=True),
+         Output("job-stage", "children", allow_duplicate=True),
+         Output("job-progress", "value", allow_duplicate=True),
+         Output("pending-download", "data")],
+        Input("btn-download", "n_clicks"),
+        [State("ticker-input", "value"),
+         State("scenario-switch", "value"),
+         State("session-id", "data")],
+        prevent_initial_call=True
+    )
+    @profiled('download')
+    @timed('download')
+    def download_excel(n_clicks, ticker, with_scenarios, session_id):
+        unchanged = (dash.no_update,) * 6
+        if not ticker:
+            return (dash.no_update, dash.no_update) + unchanged
+        ticker = ticker.upper()
+        state = sessions.get(session_id) if session_id else None
+        if not state or state['ticker'] != ticker:
+            # Not generated yet: fetch and build in a job, download_when_ready sends the file
+            job_id = jobs.submit(ticker)
+            pending = {'ticker': ticker, 'scenarios': bool(with_scenarios)}
+            return (dash.no_update, dash.no_update, job_id, False, {"display": "block"},
+                    f"{ticker}: queued...", 0, pending)
+        try:
+            # The job already built both variants, this is a cache hit
+            data = workbook_bytes(state['df'], state['meta'], scenarios=bool(with_scenarios))
+        except Exception as e:
+            alert = dbc.Alert([html.I(className="fas fa-exclamation-circle me-2"), str(e)], color="danger", dismissable=True)
+            return (dash.no_update, alert) + unchanged
+        return (dcc.send_bytes(data, f"{ticker}_Model.xlsx"), dash.no_update) + unchanged
+
+    @app.callback(
+        [Output("download-excel", "data", allow_duplicate=True),
+         Output("pending-download", "data", allow_duplicate=True),
+         Output("status-alert-container", "children", allow_duplicate=True)],
+        Input("job-result", "data"),
+        State("pending-download", "data"),
+        prevent_initial_call=True
+    )
+    @timed('download')
+    def download_when_ready(job, pending):
+        if not pending or not job or job.get("ticker") != pending['ticker']:
+            return dash.no_update, dash.no_update, dash.no_update
+        if job["status"] != "done":
+            return dash.no_update, None, dash.no_update  # update_dashboard shows why
+        ticker = pending['ticker']
+        try:
+            # Both the data and the workbook are in the shared caches now
+            df, meta = fetch_company_data(ticker)
+            data = workbook_bytes(df, meta, scenarios=pending['scenarios'])
+        except Exception as e:
+            alert = dbc.Alert([html.I(className="fas fa-exclamation-circle me-2"), str(e)], color="danger", dismissable=True)
+            return dash.no_update, None, alert
+        return dcc.send_bytes(data, f"{ticker}_Model.xlsx"), None, dash.no_update
+
+    return app
+
+def build_tab_content(active_tab, df, meta, lines=None, window=None, bands=None):
+    """
+    Server-side tabs, the charts in tabs 1-3 are drawn in the browser (assets/tabs.js).
+    lines: model_lines(df) if already computed, window: historical periods the classic view shows (None/0 = all),
+    bands: run_scenarios(df) if already computed.
+    """
+    import plotly.graph_objects as go
+
+    if active_tab == "tab-4":
+        # Classic model view - every Model sheet line, historical and projected.
+        # Raw numbers go to the browser, formatting and styling happen there.
+        # Shown to the unit, so whole numbers keep the payload small
+        if lines is None:
+            lines = model_lines(df)
+        n_hist = len(df)
+        # The table grows by column, one per period, so older history is windowed off
+        if window and n_hist > window:
+            lines = lines.iloc[n_hist - window:]
+            n_hist = window
+        lines = lines.round().astype('int64')
+        labels = list(lines.index)
+        
+        money = Format(precision=0, scheme=Scheme.fixed).group(True)
+        columns = [{"name": "", "id": "line"}] + [
+            {"name": yr, "id": f"c{i}", "type": "numeric", "format": money} for i, yr in enumerate(labels)
+        ]
+        
+        rows = []
+        for section, items in (("INCOME STATEMENT", IS_ITEMS), ("BALANCE SHEET", BS_ITEMS)):
+            rows.append({"line": section})
+            for label, _ in items:
+                row = dict(zip((f"c{i}" for i in range(len(labels))), lines[label].tolist()))
+                row["line"] = label
+                rows.append(row)
+        
+        subtotals = [label for label, key in IS_ITEMS + BS_ITEMS if key == 'Calc']
+        proj_cols = [f"c{i}" for i in range(n_hist, len(labels))]
+        
+        return dash_table.DataTable(
+            id="classic-table",
+            columns=columns,
+            data=rows,
+            fixed_columns={"headers": True, "data": 1},
+            fixed_rows={"headers": True},
+            page_action="none",
+            style_as_list_view=True,
+            style_table={"height": "600px", "overflowY": "auto", "overflowX": "auto", "minWidth": "100%"},
+            style_cell={"fontFamily": "monospace", "fontSize": "14px", "padding": "8px", "minWidth": "110px"},
+            style_header={"fontWeight": "bold", "backgroundColor": "#f5f5f5", "textAlign": "center"},
+            style_cell_conditional=[{"if": {"column_id": "line"}, "textAlign": "left", "fontWeight": "bold",
+                                     "fontFamily": "Arial, sans-serif", "minWidth": "180px"}],
+            style_header_conditional=[{"if": {"column_id": proj_cols}, "backgroundColor": "#e8eef8"}],
+            style_data_conditional=[
+                {"if": {"column_id": proj_cols}, "color": "#555", "fontStyle": "italic"},
+                {"if": {"filter_query": " || ".join(f'{{line}} = "{l}"' for l in subtotals)}, "fontWeight": "bold"},
+                {"if": {"filter_query": '{line} = "INCOME STATEMENT" || {line} = "BALANCE SHEET"'},
+                 "backgroundColor": "#2F5597", "color": "white", "fontWeight": "bold"},
+            ],
+        )
+    
+    elif active_tab == "tab-5":
+        # Monte Carlo over drivers sampled from this ticker's history
+        if bands is None:
+            bands = run_scenarios(df)
+        rev = bands['Revenue']
+        years = list(rev.columns)
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=years, y=rev.loc['P95'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=years, y=rev.loc['P5'], name='P5-P95', fill='tonexty',
+                                 fillcolor='rgba(47,85,151,0.15)', line=dict(width=0)))
+        fig.add_trace(go.Scatter(x=years, y=rev.loc['P75'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=years, y=rev.loc['P25'], name='P25-P75', fill='tonexty',
+                                 fillcolor='rgba(47,85,151,0.35)', line=dict(width=0)))
+        fig.add_trace(go.Scatter(x=years, y=rev.loc['P50'], name='Median', line=dict(color='#2F5597', width=3)))
+        fig.update_layout(
+            yaxis=dict(title="Revenue"),
+            template="plotly_white",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=40, r=40, t=40, b=40),
+            hovermode="x unified"
+        )
+        
+        # Final year spread for each metric
+        cell = {"textAlign": "right", "padding": "8px", "borderBottom": "1px solid #ddd", "fontFamily": "monospace"}
+        header = html.Tr([html.Th(f"{years[-1]}", style={"padding": "8px", "backgroundColor": "#f5f5f5"})] + [
+            html.Th(p, style={"padding": "8px", "backgroundColor": "#f5f5f5", "textAlign": "center"}) for p in rev.index
+        ])
+        rows = [
+            html.Tr([html.Td(metric, style={"fontWeight": "bold", "padding": "8px", "borderBottom": "1px solid #ddd"})] + [
+                html.Td(f"{val:,.0f}", style=cell) for val in vals.iloc[:, -1]
+            ])
+            for metric, vals in bands.items()
+        ]
+        
+        return html.Div([
+            dcc.Graph(figure=fig, config={'displayModeBar': False}, style={"height": "400px"}),
+            html.Table([header] + rows, style={"borderCollapse": "collapse", "width": "100%", "fontSize": "14px"})
+        ])
+    
+    return html.Div()
@@ -0,0 +1,183 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from automodeler.model import generate_excel_file
+
+"""
+Headless batch mode - build <TICKER>_Model.xlsx for a whole ticker list.
+
+    python -m automodeler.batch tickers.txt -o models/ --workers 8 --rate 2
+
+Each finished ticker is appended to models/manifest.jsonl, reruns skip the
+tickers that already succeeded.
+"""
+
+MANIFEST = 'manifest.jsonl'
+
+# Set in each worker by _init_worker, shared across the whole pool by run_pool
+_rate_lock = None
+_next_slot = None
+_interval = 0.0
+
+
+def read_tickers(path):
+    """One ticker per line, blank lines and # comments ignored"""
+    tickers = []
+    with open(path) as f:
+        for line in f:
+            ticker = line.split('#')[0].strip().upper()
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def load_manifest(out_dir):
+    """Latest manifest record per ticker"""
+    records = {}
+    path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # partial line from an interrupted run
+                records[record['ticker']] = record
+    return records
+
+
+def model_path(out_dir, ticker):
+    return os.path.join(out_dir, f"{ticker}_Model.xlsx")
+
+
+def _init_worker(lock, next_slot, interval):
+    global _rate_lock, _next_slot, _interval
+    _rate_lock, _next_slot, _interval = lock, next_slot, interval
+
+
+def _wait_for_slot():
+    # Spaces ticker starts out across all workers, at most `rate` per second
+    if not _interval:
+        return
+    with _rate_lock:
+        now = time.time()
+        slot = max(now, _next_slot.value)
+        _next_slot.value = slot + _interval
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _paced(fn, args):
+    _wait_for_slot()
+    return fn(*args)
+
+
+def run_pool(fn, jobs, workers=4, rate=None):
+    """
+    Run fn(*args) for each (ticker, args) in jobs across a process pool, starting at most
+    `rate` tickers per second across all workers. Yields (ticker, result, error) as each finishes,
+    error is set when the worker process itself died (OOM, segfault...).
+    """
+    ctx = multiprocessing.get_context()
+    lock = ctx.Lock()
+    next_slot = ctx.Value('d', 0.0, lock=False)
+    interval = 1.0 / rate if rate else 0.0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(lock, next_slot, interval)) as pool:
+        futures = {pool.submit(_paced, fn, args): ticker for ticker, args in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def build_model(ticker, out_dir, use_cache=True, scenarios=False):
+    """Fetch and write one workbook, returns its manifest record"""
+    start = time.time()
+    record = {'ticker': ticker, 'status': 'ok', 'error': None, 'path': None}
+    try:
+        output, _, err = generate_excel_file(ticker, use_cache=use_cache, scenarios=scenarios,
+                                               constant_memory=True)
+        if output is None:
+            raise RuntimeError(err)
+        path = model_path(out_dir, ticker)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(output.getbuffer())
+        os.replace(tmp, path)  # no half-written workbooks if we get killed
+        record['path'] = path
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = str(e)
+    record['seconds'] = round(time.time() - start, 3)
+    record['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return record
+
+
+def run_batch(tickers, out_dir, workers=4, rate=None, resume=True, use_cache=True, scenarios=False,
+              on_record=None):
+    """Build models for tickers across a process pool, returns the new manifest records"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    if resume:
+        done = load_manifest(out_dir)
+        tickers = [
+            t for t in tickers
+            if not (done.get(t, {}).get('status') == 'ok' and os.path.exists(model_path(out_dir, t)))
+        ]
+
+    records = []
+    if not tickers:
+        return records
+
+    jobs = ((t, (t, out_dir, use_cache, scenarios)) for t in tickers)
+    with open(os.path.join(out_dir, MANIFEST), 'a') as manifest:
+        for ticker, record, error in run_pool(build_model, jobs, workers, rate):
+            if error is not None:
+                record = {'ticker': ticker, 'status': 'failed', 'error': str(error),
+                          'path': None, 'seconds': None, 'finished': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            manifest.write(json.dumps(record) + '\n')
+            manifest.flush()
+            records.append(record)
+            if on_record:
+                on_record(record)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate 3-statement models for a list of tickers")
+    parser.add_argument('tickers', help="file with one ticker per line")
+    parser.add_argument('-o', '--output', default='models', help="output directory (default: models)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 4, help="worker processes")
+    parser.add_argument('--rate', type=float, default=None, help="max tickers started per second across all workers")
+    parser.add_argument('--no-resume', action='store_true', help="rebuild tickers that already succeeded")
+    parser.add_argument('--no-cache', action='store_true', help="always refetch from the provider")
+    parser.add_argument('--scenarios', action='store_true', help="add a Monte Carlo Scenarios sheet")
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.tickers)
+
+    def report(record):
+        status = 'ok' if record['status'] == 'ok' else f"FAILED: {record['error']}"
+        print(f"{record['ticker']:<8} {record['seconds'] or 0:>7.2f}s  {status}", flush=True)
+
+    records = run_batch(tickers, args.output, workers=args.workers, rate=args.rate,
+                        resume=not args.no_resume, use_cache=not args.no_cache,
+                        scenarios=args.scenarios, on_record=report)
+    failed = sum(1 for r in records if r['status'] != 'ok')
+    print(f"Done: {len(records) - failed} ok, {failed} failed, {len(tickers) - len(records)} skipped")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+"""
+Caches for fetched company data and built workbooks.
+Company data uses a small in-process LRU in front of a SQLite file so repeat tickers skip yfinance.
+"""
+
+DEFAULT_TTL = 24 * 60 * 60  # statements only change a few times a year
+TOUCH_INTERVAL = 60  # seconds between writing memory hits back to the store
+
+
+class SQLiteFile:
+    """
+    A SQLite file shared by threads and processes. connect() opens a new connection per
+    call, runs it as one transaction and closes it. The schema is created on first use, not at import.
+    """
+
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self._ready = False
+
+    @contextmanager
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._ready:
+                with conn:
+                    for statement in self.schema:
+                        conn.execute(statement)
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+class SQLiteStore:
+    """Local on-disk store, bounded by entry count (least recently used goes first)"""
+
+    def __init__(self, path, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._db = SQLiteFile(path, [
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)"
+        ])
+
+    def _connect(self):
+        return self._db.connect()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires = row
+            if expires < now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return value, expires
+
+    def touch(self, keys, accessed):
+        """Mark keys as used at `accessed` (hits served from a memory layer in front)"""
+        with self._connect() as conn:
+            conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?", [(accessed, k) for k in keys])
+
+    def set(self, key, value, expires):
+        evicted = 0
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, expires, time.time())
+            )
+            count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if count > self.max_entries:
+                evicted = count - self.max_entries
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (evicted,)
+                )
+        return evicted
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+
+class DataCache:
+    """LRU of (data, meta) results with per-entry TTL, backed by an optional store"""
+
+    def __init__(self, store=None, ttl=DEFAULT_TTL, max_memory=256, touch_interval=TOUCH_INTERVAL):
+        self.store = store
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.touch_interval = touch_interval
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Memory hits never reach the store, so its eviction order is refreshed in batches
+        self._touched = set()
+        self._flushed = time.time()
+        self.counters = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] < now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.counters['hits'] += 1
+                self.counters['memory_hits'] += 1
+                touched = self._touch(key, now)
+        if entry is not None:
+            if touched:
+                self.store.touch(touched, now)
+            return entry[0]
+
+        if self.store is not None:
+            row = self.store.get(key)
+            if row is not None:
+                value = pickle.loads(row[0])
+                with self._lock:
+                    self._remember(key, value, row[1])
+                    self.counters['hits'] += 1
+                    self.counters['disk_hits'] += 1
+                return value
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires)
+        if self.store is not None:
+            evicted = self.store.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires)
+            with self._lock:
+                self.counters['evictions'] += evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_entries'] = len(self._memory)
+        return stats
+
+    def _touch(self, key, now):
+        # Caller holds the lock. Returns the keys to write back, if it is time to
+        if self.store is None:
+            return None
+        self._touched.add(key)
+        if now - self._flushed < self.touch_interval:
+            return None
+        touched, self._touched, self._flushed = self._touched, set(), now
+        return touched
+
+    def _remember(self, key, value, expires):
+        # Caller holds the lock
+        self._memory[key] = (value, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+            self.counters['evictions'] += 1
+
+
+class BytesLRU:
+    """In-process LRU of bytes values, bounded by total size rather than entry count"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.counters['misses'] += 1
+                return None
+            self._items.move_to_end(key)
+            self.counters['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._items)
+            stats['bytes'] = self.size
+        return stats
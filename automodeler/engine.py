@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+"""
+Native model engine - the Excel model's drivers and projections in NumPy.
+Mirrors the formulas written by generate_excel_file so numbers match Excel's.
+"""
+
+PROJ_YEARS = 5
+
+DRIVERS = [
+    "Revenue Growth %",
+    "COGS % of Revenue",
+    "SG&A % of Revenue",
+    "Tax Rate %",
+    "D&A % of PP&E",
+    "Capex % of Revenue"
+]
+
+# (Model sheet label, hist_data column or 'Calc')
+IS_ITEMS = [
+    ("Revenue", 'Revenue'),
+    ("COGS", 'COGS'),
+    ("Gross Profit", 'Calc'),
+    ("SG&A", 'SG&A'),
+    ("EBITDA", 'Calc'),
+    ("D&A", 'D&A'),
+    ("EBIT", 'Calc'),
+    ("Interest Expense", 'Interest'),
+    ("EBT", 'Calc'),
+    ("Tax", 'Tax'),
+    ("Net Income", 'Net Income')
+]
+
+BS_ITEMS = [
+    ("Cash", 'Cash'),
+    ("Accounts Receivable", 'AR'),
+    ("PP&E", 'PP&E'),
+    ("Other Assets", 'Other Assets'),
+    ("Total Assets", 'Calc'),
+    ("Accounts Payable", 'AP'),
+    ("Debt", 'Debt'),
+    ("Other Liabilities", 'Other Liab'),
+    ("Total Liabilities", 'Calc'),
+    ("Share Capital", 'Share Capital'),
+    ("Retained Earnings", 'Retained Earnings'),
+    ("Total Equity", 'Calc'),
+    ("Check", 'Calc')
+]
+
+LINES = [label for label, _ in IS_ITEMS + BS_ITEMS]
+
+# Balance sheet lines the model carries forward flat
+_FLAT_BS = ["Cash", "Accounts Receivable", "PP&E", "Other Assets",
+            "Accounts Payable", "Debt", "Other Liabilities", "Share Capital"]
+
+
+def _safe_div(num, den, fallback=0.0):
+    # num / den, with fallback wherever den is zero
+    out = np.full(len(num), fallback)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def compute_drivers(hist_data):
+    """Historical drivers for the Assumptions sheet, one column per driver"""
+    col = lambda key: hist_data[key].to_numpy(dtype=float)
+    rev = col('Revenue')
+
+    growth = np.zeros(len(rev))
+    if len(rev) > 1:
+        growth[1:] = _safe_div(rev[1:], rev[:-1], fallback=1.0) - 1
+
+    pre_tax = rev - col('COGS') - col('SG&A') - col('Interest')
+
+    return pd.DataFrame({
+        "Revenue Growth %": growth,
+        "COGS % of Revenue": _safe_div(col('COGS'), rev),
+        "SG&A % of Revenue": _safe_div(col('SG&A'), rev),
+        "Tax Rate %": _safe_div(col('Tax'), pre_tax, fallback=0.21),
+        "D&A % of PP&E": _safe_div(col('D&A'), col('PP&E')),
+        "Capex % of Revenue": _safe_div(np.abs(col('Capex')), rev),
+    }, index=hist_data.index)
+
+
+def _income_totals(v):
+    v["Gross Profit"] = v["Revenue"] - v["COGS"]
+    v["EBITDA"] = v["Gross Profit"] - v["SG&A"]
+    v["EBIT"] = v["EBITDA"] - v["D&A"]
+    v["EBT"] = v["EBIT"] - v["Interest Expense"]
+
+
+def _balance_totals(v):
+    # Same summation order as the sheet's SUM() ranges
+    v["Total Assets"] = v["Cash"] + v["Accounts Receivable"] + v["PP&E"] + v["Other Assets"]
+    v["Total Liabilities"] = v["Accounts Payable"] + v["Debt"] + v["Other Liabilities"]
+    v["Total Equity"] = v["Share Capital"] + v["Retained Earnings"]
+    v["Check"] = v["Total Assets"] - (v["Total Liabilities"] + v["Total Equity"])
+
+
+def _historical_lines(hist_data):
+    # Model sheet lines for the historical periods, arrays over periods
+    v = {label: hist_data[key].to_numpy(dtype=float)
+         for label, key in IS_ITEMS + BS_ITEMS if key != 'Calc'}
+    _income_totals(v)
+    _balance_totals(v)
+    return v
+
+
+def _roll_forward(last, drivers, years):
+    """
+    Project every line `years` periods ahead.
+    last: {line: array} last historical values, drivers: {driver: array}.
+    Arrays can hold one ticker or a whole universe, returns {line: array (..., years)}.
+    """
+    prev = dict(last)
+    out = {label: [] for label in LINES}
+    for _ in range(years):
+        v = {}
+        v["Revenue"] = prev["Revenue"] * (1 + drivers["Revenue Growth %"])
+        v["COGS"] = v["Revenue"] * drivers["COGS % of Revenue"]
+        v["SG&A"] = v["Revenue"] * drivers["SG&A % of Revenue"]
+        v["D&A"] = prev["D&A"]
+        v["Interest Expense"] = np.zeros_like(v["Revenue"])
+        _income_totals(v)
+        v["Tax"] = v["EBT"] * drivers["Tax Rate %"]
+        v["Net Income"] = v["EBT"] - v["Tax"]
+
+        for label in _FLAT_BS:
+            v[label] = prev[label]
+        v["Retained Earnings"] = prev["Retained Earnings"] + v["Net Income"]
+        _balance_totals(v)
+
+        for label in LINES:
+            out[label].append(v[label])
+        prev = v
+    return {label: np.stack(vals, axis=-1) for label, vals in out.items()}
+
+
+def year_labels(hist_data, years=PROJ_YEARS):
+    """Column headers used on both sheets, e.g. 2023A ... 2028E"""
+    hist_years = [d.strftime('%Y') + "A" for d in hist_data.index]
+    proj_years = [str(int(hist_years[-1][:4]) + i) + "E" for i in range(1, years + 1)]
+    return hist_years, proj_years
+
+
+def model_lines(hist_data, drivers=None, years=PROJ_YEARS):
+    """Every Model sheet line, historical and projected, indexed by year label"""
+    if drivers is None:
+        drivers = compute_drivers(hist_data)
+    hist = _historical_lines(hist_data)
+    last = {label: vals[-1:] for label, vals in hist.items()}
+    last_drivers = {name: drivers[name].to_numpy(dtype=float)[-1:] for name in DRIVERS}
+    proj = _roll_forward(last, last_drivers, years)
+
+    hist_years, proj_years = year_labels(hist_data, years)
+    return pd.DataFrame(
+        {label: np.concatenate([hist[label], proj[label][0]]) for label in LINES},
+        index=hist_years + proj_years
+    )
+
+
+def project(hist_data, drivers=None, years=PROJ_YEARS):
+    """Projected IS/BS only, rows are the projection years (e.g. 2026E)"""
+    return model_lines(hist_data, drivers, years).iloc[len(hist_data):]
+
+
+def project_batch(hist_by_ticker, years=PROJ_YEARS):
+    """
+    Project a whole universe in one pass.
+    hist_by_ticker: {ticker: hist_data}. Returns {line: DataFrame (tickers x Y+1..Y+n)}.
+    """
+    tickers = list(hist_by_ticker)
+    if not tickers:
+        return {}
+    cols = [key for _, key in IS_ITEMS + BS_ITEMS if key != 'Calc'] + ['Interest', 'Capex']
+    cols = list(dict.fromkeys(cols))
+    rev_col = cols.index('Revenue')
+
+    # Last two periods per ticker, the only rows the projection depends on
+    last_rows = np.empty((len(tickers), len(cols)))
+    prev_rev = np.zeros(len(tickers))
+    has_prev = np.zeros(len(tickers), dtype=bool)
+    for i, t in enumerate(tickers):
+        df = hist_by_ticker[t]
+        # Positional take on the raw block, far cheaper than df[cols] per ticker
+        idx = df.columns.get_indexer(cols)
+        if (idx < 0).any():
+            raise KeyError(f"{t}: missing columns {[c for c, i in zip(cols, idx) if i < 0]}")
+        vals = df.to_numpy(dtype=float)[-2:, idx]
+        last_rows[i] = vals[-1]
+        if len(vals) > 1:
+            prev_rev[i] = vals[-2, rev_col]
+            has_prev[i] = True
+
+    last_df = pd.DataFrame(last_rows, index=tickers, columns=cols)
+    drivers = compute_drivers(last_df)
+    rev = last_df['Revenue'].to_numpy()
+    drivers["Revenue Growth %"] = np.where(has_prev, _safe_div(rev, prev_rev, fallback=1.0) - 1, 0.0)
+
+    hist = _historical_lines(last_df)
+    proj = _roll_forward(hist, {name: drivers[name].to_numpy() for name in DRIVERS}, years)
+    columns = [f"Y+{i}" for i in range(1, years + 1)]
+    return {label: pd.DataFrame(vals, index=tickers, columns=columns) for label, vals in proj.items()}
@@ -0,0 +1,203 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from automodeler.engine import compute_drivers, project
+from automodeler.model import build_workbook, fetch_company_data
+
+"""
+Model packs - many tickers in one zip, streamed as each workbook finishes.
+
+    python -m automodeler.export tickers.txt -o pack.zip --data csv
+    python -m automodeler.export tickers.txt -o - > pack.zip
+
+At most `workers` workbooks are held in memory at once, whatever the ticker count.
+Layout of the archive:
+
+    <TICKER>_Model.xlsx
+    data/historical/<TICKER>.csv    normalized statements   (with --data csv|parquet)
+    data/drivers/<TICKER>.csv       historical drivers
+    data/projections/<TICKER>.csv   projected IS/BS lines
+    manifest.jsonl                  one status record per ticker, written last
+"""
+
+DATA_FORMATS = ('csv', 'parquet')
+
+
+def _check_format(data_format):
+    if data_format not in (None,) + DATA_FORMATS:
+        raise ValueError(f"Unknown data format {data_format!r}")
+    if data_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow (pip install pyarrow), or use csv") from None
+
+
+def _frame_bytes(df, data_format):
+    buf = io.BytesIO()
+    if data_format == 'parquet':
+        df.to_parquet(buf)
+    else:
+        df.to_csv(buf)
+    return buf.getvalue()
+
+
+def _build_entry(ticker, use_cache, scenarios, data_format):
+    # Runs in a worker thread, returns the files for one ticker
+    hist_data, meta = fetch_company_data(ticker, use_cache=use_cache)
+    files = [(f"{ticker}_Model.xlsx", build_workbook(hist_data, meta, scenarios, constant_memory=True).getvalue())]
+    if data_format:
+        ext = data_format
+        historical = hist_data.copy()
+        historical.index = historical.index.strftime('%Y-%m-%d')
+        historical.index.name = 'period'
+        drivers = compute_drivers(hist_data)
+        drivers.index = historical.index
+        files += [
+            (f"data/historical/{ticker}.{ext}", _frame_bytes(historical, data_format)),
+            (f"data/drivers/{ticker}.{ext}", _frame_bytes(drivers, data_format)),
+            (f"data/projections/{ticker}.{ext}", _frame_bytes(project(hist_data).rename_axis('year'), data_format)),
+        ]
+    return files
+
+
+def _results(tickers, workers, use_cache, scenarios, data_format):
+    # (ticker, files or None, error) in completion order, never more than `workers` in flight
+    pending = iter(tickers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export') as pool:
+        running = {}
+        for ticker in pending:
+            running[pool.submit(_build_entry, ticker, use_cache, scenarios, data_format)] = ticker
+            if len(running) >= workers:
+                break
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = running.pop(future)
+                try:
+                    yield ticker, future.result(), None
+                except Exception as e:
+                    yield ticker, None, str(e)
+                nxt = next(pending, None)
+                if nxt is not None:
+                    running[pool.submit(_build_entry, nxt, use_cache, scenarios, data_format)] = nxt
+
+
+def write_pack(archive, tickers, workers=4, use_cache=True, scenarios=False, data_format=None):
+    """
+    Add every ticker to an open ZipFile as it finishes, yields one record per ticker.
+    The manifest goes in once the generator is exhausted.
+    """
+    _check_format(data_format)
+    records = []
+    for ticker, files, error in _results(tickers, workers, use_cache, scenarios, data_format):
+        record = {'ticker': ticker, 'status': 'ok' if files else 'failed', 'error': error, 'files': []}
+        for name, data in files or ():
+            # xlsx and parquet are compressed already
+            compress = zipfile.ZIP_DEFLATED if name.endswith('.csv') else zipfile.ZIP_STORED
+            archive.writestr(name, data, compress_type=compress)
+            record['files'].append(name)
+        record['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        records.append(record)
+        yield record
+    archive.writestr('manifest.jsonl', ''.join(json.dumps(r) + '\n' for r in records),
+                     compress_type=zipfile.ZIP_DEFLATED)
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only, unseekable sink that hands back what was written since the last drain()"""
+
+    def __init__(self):
+        self._parts = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_pack(tickers, workers=4, use_cache=True, scenarios=False, data_format=None):
+    """
+    Zip bytes in chunks as each ticker lands, for a streamed HTTP response.
+    A bad data format raises here, before any ticker is fetched.
+    """
+    _check_format(data_format)
+    return _stream(tickers, workers, use_cache, scenarios, data_format)
+
+
+def _stream(tickers, workers, use_cache, scenarios, data_format):
+    sink = _Chunks()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for _ in write_pack(archive, tickers, workers, use_cache, scenarios, data_format):
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    yield sink.drain()  # manifest and central directory
+
+
+def export_pack(tickers, path, workers=4, use_cache=True, scenarios=False, data_format=None, on_record=None):
+    """Write a pack to disk (path, or '-' for stdout), returns the manifest records"""
+    _check_format(data_format)
+    records = []
+    target = sys.stdout.buffer if path == '-' else path + '.tmp'
+    with zipfile.ZipFile(target, 'w') as archive:
+        for record in write_pack(archive, tickers, workers, use_cache, scenarios, data_format):
+            records.append(record)
+            if on_record:
+                on_record(record)
+    if path == '-':
+        sys.stdout.buffer.flush()
+    else:
+        os.replace(target, path)
+    return records
+
+
+def main(argv=None):
+    from automodeler.batch import read_tickers
+
+    parser = argparse.ArgumentParser(description="Export a zip of models for a list of tickers")
+    parser.add_argument('tickers', help="file with one ticker per line")
+    parser.add_argument('-o', '--output', default='models.zip', help="zip file to write, - for stdout (default: models.zip)")
+    parser.add_argument('-w', '--workers', type=int, default=4, help="tickers built concurrently (default 4)")
+    parser.add_argument('--data', choices=DATA_FORMATS, default=None,
+                        help="also dump historical data, drivers and projections")
+    parser.add_argument('--no-cache', action='store_true', help="always refetch from the provider")
+    parser.add_argument('--scenarios', action='store_true', help="add a Monte Carlo Scenarios sheet")
+    args = parser.parse_args(argv)
+
+    def report(record):
+        status = 'ok' if record['status'] == 'ok' else f"FAILED: {record['error']}"
+        print(f"{record['ticker']:<8} {status}", file=sys.stderr, flush=True)
+
+    try:
+        records = export_pack(read_tickers(args.tickers), args.output, workers=args.workers,
+                              use_cache=not args.no_cache, scenarios=args.scenarios,
+                              data_format=args.data, on_record=report)
+    except ValueError as e:
+        parser.error(str(e))
+    failed = sum(1 for r in records if r['status'] != 'ok')
+    if args.output != '-':
+        print(f"Done: {len(records) - failed} ok, {failed} failed -> {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from automodeler.cache import SQLiteFile
+from automodeler.metrics import metrics
+
+"""
+Background model generation - a SQLite job table plus a local process pool.
+
+The dashboard submits a job and polls it. Job processes fetch the statements, project them,
+run the scenario bands and build both workbook variants, recording each stage as they go.
+Results land in the shared data and artifact caches, so the web worker only renders and
+serves what the job left there. Any web worker can read a job's status, so polling doesn't
+have to land on the process that submitted it. Active jobs for the same ticker are
+deduplicated, cancellation is checked during the fetch and between stages.
+
+Each queue keeps the active jobs it submitted alive with a heartbeat. A queued or running
+job whose queue went away (web worker restarted or killed) stops being reused and shows
+as failed once the heartbeat is JOB_STALE old.
+"""
+
+JOB_TTL = 24 * 60 * 60  # jobs not updated for this long are pruned, whatever their status
+JOB_HEARTBEAT = 10  # seconds between a queue's heartbeats for its active jobs
+JOB_STALE = 6 * JOB_HEARTBEAT  # an active job without a heartbeat for this long is dead
+ACTIVE = ('queued', 'running')
+FINISHED = ('done', 'failed', 'cancelled')
+
+_COLUMNS = ('id', 'key', 'ticker', 'status', 'stage', 'progress', 'error',
+            'cancel_requested', 'owner', 'heartbeat', 'created', 'updated')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobStore:
+    """Job rows in a SQLite file shared by web workers and job processes"""
+
+    def __init__(self, path, ttl=JOB_TTL, stale=JOB_STALE):
+        self.path = path
+        self.ttl = ttl
+        self.stale = stale
+        self._db = SQLiteFile(path, [
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, key TEXT, ticker TEXT, status TEXT, stage TEXT, "
+            "progress REAL, error TEXT, cancel_requested INTEGER DEFAULT 0, owner TEXT, heartbeat REAL, "
+            "created REAL, updated REAL)",
+            "CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)",
+            "CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, status)",
+        ])
+
+    def _connect(self):
+        return self._db.connect()
+
+    def create(self, ticker, owner):
+        """New queued job, or the id of a live active one for the same ticker. Returns (id, created)"""
+        key = ticker
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # no other writer between the lookup and the insert
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND cancel_requested = 0 "
+                "AND status IN ('queued', 'running') AND heartbeat > ? ORDER BY created DESC LIMIT 1",
+                (key, now - self.stale)
+            ).fetchone()
+            if row is not None:
+                return row[0], False
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, key, ticker, status, stage, progress, owner, heartbeat, created, updated) "
+                "VALUES (?, ?, ?, 'queued', 'queued', 0, ?, ?, ?, ?)",
+                (job_id, key, ticker, owner, now, now, now)
+            )
+            conn.execute("DELETE FROM jobs WHERE updated < ?", (now - self.ttl,))
+        return job_id, True
+
+    def beat(self, owner):
+        """Keep an owner's active jobs alive"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN ('queued', 'running')",
+                         (time.time(), owner))
+
+    def status(self, job_id):
+        """Status as stored, without get()'s dead-job view"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        if job['status'] in ACTIVE and job['heartbeat'] < time.time() - self.stale:
+            job['status'], job['error'] = 'failed', 'job stopped responding'
+        return job
+
+    def update(self, job_id, **fields):
+        fields['updated'] = time.time()
+        names = ', '.join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {names} WHERE id = ?", (*fields.values(), job_id))
+
+    def fail(self, job_id, error):
+        """Mark a job failed, unless it already finished"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', stage = 'failed', error = ?, updated = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (error, time.time(), job_id)
+            )
+
+    def cancel(self, job_id):
+        """Ask a job to stop, a queued one is cancelled right away"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET cancel_requested = 1, updated = ? WHERE id = ?", (time.time(), job_id))
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', stage = 'cancelled' WHERE id = ? AND status = 'queued'",
+                (job_id,)
+            )
+
+    def cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+
+def generate_job(db_path, job_id):
+    """
+    Job body, runs in a pool process: fetch, project, simulate and build both workbooks
+    into the shared caches, where the dashboard and the Download button pick them up
+    """
+    from automodeler import model
+    from automodeler.providers import FetchCancelled
+
+    store = JobStore(db_path)
+    if store.status(job_id) != 'queued':
+        return  # cancelled (or pruned) while waiting for a worker
+    ticker = store.get(job_id)['ticker']
+
+    def stage(name, progress):
+        if store.cancel_requested(job_id):
+            raise JobCancelled()
+        store.update(job_id, status='running', stage=name, progress=progress)
+
+    try:
+        stage('fetching', 0.1)
+        df, meta = model.fetch_company_data(ticker, cancelled=lambda: store.cancel_requested(job_id))
+        stage('projecting', 0.4)
+        model.projected_lines(df, meta)
+        stage('running scenarios', 0.5)
+        model.scenario_bands(df, meta)
+        stage('building workbook', 0.7)
+        model.stored_workbook(df, meta, scenarios=False)
+        stage('building scenario workbook', 0.85)
+        model.stored_workbook(df, meta, scenarios=True)
+        if store.cancel_requested(job_id):
+            raise JobCancelled()
+        store.update(job_id, status='done', stage='done', progress=1.0)
+    except (JobCancelled, FetchCancelled):
+        store.update(job_id, status='cancelled', stage='cancelled')
+    except Exception as e:
+        store.update(job_id, status='failed', stage='failed', error=str(e))
+
+
+class JobQueue:
+    """Submits jobs to a process pool started on first use"""
+
+    def __init__(self, store, workers=2, start_method='spawn'):
+        self.store = store
+        self.workers = workers
+        self.start_method = start_method
+        # Names this queue in the job table, its heartbeat is what keeps its jobs alive
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._heartbeat = None
+        self._stopped = threading.Event()
+
+    def _get_pool(self):
+        # Caller holds the lock. spawn by default: forking a threaded web server is asking for trouble
+        if self._pool is None:
+            ctx = multiprocessing.get_context(self.start_method)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._pool
+
+    def _drop_pool(self, pool):
+        # Caller holds the lock. A broken pool never recovers, the next submit starts a new one
+        if self._pool is pool:
+            self._pool = None
+
+    def _beat(self):
+        while not self._stopped.wait(JOB_HEARTBEAT):
+            with self._lock:
+                busy = bool(self._futures)
+            if busy:
+                try:
+                    self.store.beat(self.owner)
+                except Exception:
+                    metrics.count('job_heartbeat_failed')
+
+    def submit(self, ticker):
+        """Returns the job id, reusing a live active job for the same ticker"""
+        job_id, created = self.store.create(ticker, self.owner)
+        if not created:
+            metrics.count('job_deduplicated')
+            return job_id
+        metrics.count('job_submitted')
+        try:
+            pool, future = self._submit(job_id)
+        except Exception as e:
+            # No process will pick the row up, don't leave it queued for others to reuse
+            metrics.count('job_submit_failed')
+            self.store.fail(job_id, f"could not start the job ({str(e) or type(e).__name__})")
+            return job_id
+        future.add_done_callback(lambda f: self._finished(job_id, f, pool))
+        return job_id
+
+    def _submit(self, job_id):
+        with self._lock:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    future = pool.submit(generate_job, self.store.path, job_id)
+                    break
+                except BrokenProcessPool:
+                    # An earlier job process died and took the pool with it, retry once on a new one
+                    metrics.count('job_pool_broken')
+                    self._drop_pool(pool)
+                    if attempt:
+                        raise
+            self._futures[job_id] = future
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+        return pool, future
+
+    def _finished(self, job_id, future, pool):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            if future.cancelled():
+                return
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                metrics.count('job_pool_broken')
+                self._drop_pool(pool)
+        if error is not None:
+            # The worker died before it could record anything (OOM, killed...)
+            self.store.fail(job_id, str(error) or type(error).__name__)
+
+    def cancel(self, job_id):
+        self.store.cancel(job_id)
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()  # only works while it is still waiting for a worker
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_job_queue():
+    """Queue from AUTOMODELER_JOB_DB and AUTOMODELER_JOB_WORKERS"""
+    store = JobStore(os.environ.get('AUTOMODELER_JOB_DB', '.automodeler_jobs.sqlite'))
+    return JobQueue(store, workers=int(os.environ.get('AUTOMODELER_JOB_WORKERS', 2)))
@@ -0,0 +1,118 @@
+import functools
+from collections import namedtuple
+
+from automodeler.engine import BS_ITEMS, DRIVERS, IS_ITEMS, PROJ_YEARS
+
+"""
+Compiled workbook layout - every row, formula string and format for one shape of model.
+The formulas only depend on how many historical and projected periods there are, so they
+are built once per shape and each ticker just drops its own numbers in.
+Rows and cells come out in sheet order, as xlsxwriter's constant_memory mode requires.
+"""
+
+# One sheet row:
+#   row, text, text_fmt   label in column A
+#   hist, hist_fmt        column written from B on (hist_data column or driver), or None
+#   line, cell_fmt        column holding the cached values for the cells below, or None
+#   cells                 (col, formula, index into the line's values), formula None = literal 0
+Row = namedtuple('Row', 'row text text_fmt hist hist_fmt line cell_fmt cells')
+Layout = namedtuple('Layout', 'hist_cols proj_cols assumptions model')
+
+# Projection formula per IS line, subtotals use the same one in historical columns.
+# {c} this column, {p} previous column, {r} this row, {Label} that line's row.
+# Assumptions rows are fixed (drivers start on row 4)
+_IS_PROJ = {
+    "Revenue": "={p}{r}*(1+Assumptions!{c}4)",
+    "COGS": "={c}{Revenue}*Assumptions!{c}5",
+    "SG&A": "={c}{Revenue}*Assumptions!{c}6",
+    "Interest Expense": None,  # no debt schedule, written as 0
+    "Tax": "={c}{EBT}*Assumptions!{c}7",
+    "D&A": "={p}{r}",
+    "Gross Profit": "={c}{Revenue}-{c}{COGS}",
+    "EBITDA": "={c}{Gross Profit}-{c}{SG&A}",
+    "EBIT": "={c}{EBITDA}-{c}{D&A}",
+    "EBT": "={c}{EBIT}-{c}{Interest Expense}",
+    "Net Income": "={c}{EBT}-{c}{Tax}",
+}
+# Balance sheet subtotals, the same formula in historical and projected columns
+_BS_CALC = {
+    "Total Assets": "=SUM({c}{Cash}:{c}{Other Assets})",
+    "Total Liabilities": "=SUM({c}{Accounts Payable}:{c}{Other Liabilities})",
+    "Total Equity": "={c}{Share Capital}+{c}{Retained Earnings}",
+    "Check": "={c}{Total Assets}-({c}{Total Liabilities}+{c}{Total Equity})",
+}
+
+
+def _fill(template, col, prev, row, row_map):
+    # str.format can't take keys like "SG&A", substitute by hand
+    out = template.replace('{c}', col).replace('{p}', prev).replace('{r}', str(row))
+    for label, excel_row in row_map.items():
+        out = out.replace('{' + label + '}', str(excel_row))
+    return out
+
+
+@functools.lru_cache(maxsize=64)
+def compile_layout(hist_cols, proj_cols=PROJ_YEARS):
+    """Layout for hist_cols historical and proj_cols projected periods, cached per shape"""
+    from xlsxwriter.utility import xl_col_to_name
+
+    names = [xl_col_to_name(c) for c in range(hist_cols + proj_cols + 1)]
+    proj = range(hist_cols + 1, hist_cols + proj_cols + 1)
+
+    # Assumptions: historical drivers, projections repeat the last one
+    assumptions = []
+    for r, driver in enumerate(DRIVERS):
+        cells = tuple((c, f"={names[hist_cols]}{r + 4}", hist_cols - 1) for c in proj)
+        assumptions.append(Row(r + 3, driver, 'bold', driver, 'pct', driver, 'pct', cells))
+
+    model = []
+    row_map = {}
+    r = 3
+    model.append(Row(r, "INCOME STATEMENT", 'bold', None, None, None, None, ()))
+    for label, key in IS_ITEMS:
+        r += 1
+        row_map[label] = r + 1
+        cells = []
+        if key == 'Calc':
+            cells += [(c, _fill(_IS_PROJ[label], names[c], '', r + 1, row_map), c - 1) for c in range(1, hist_cols + 1)]
+        if label in _IS_PROJ:
+            template = _IS_PROJ[label]
+            cells += [(c, None if template is None else _fill(template, names[c], names[c - 1], r + 1, row_map), c - 1)
+                      for c in proj]
+        model.append(Row(r, label, None, None if key == 'Calc' else key, 'blue', label, 'black', tuple(cells)))
+
+    r += 3
+    model.append(Row(r, "BALANCE SHEET", 'bold', None, None, None, None, ()))
+    for label, key in BS_ITEMS:
+        r += 1
+        row_map[label] = r + 1
+        cells = []
+        if key == 'Calc':
+            template = _BS_CALC[label]
+            cells += [(c, _fill(template, names[c], '', r + 1, row_map), c - 1) for c in range(1, hist_cols + 1)]
+            cells += [(c, _fill(template, names[c], '', r + 1, row_map), c - 1) for c in proj]
+        elif label == "Retained Earnings":
+            cells += [(c, _fill("={p}{r}+{c}{Net Income}", names[c], names[c - 1], r + 1, row_map), c - 1) for c in proj]
+        else:
+            # Everything else (cash included) is held flat
+            cells += [(c, f"={names[c - 1]}{r + 1}", c - 1) for c in proj]
+        model.append(Row(r, label, None, None if key == 'Calc' else key, 'blue', label, 'black', tuple(cells)))
+
+    return Layout(hist_cols, proj_cols, tuple(assumptions), tuple(model))
+
+
+def write_rows(ws, rows, hist, lines, formats):
+    """Write compiled rows, hist and lines are the frames holding the series they name"""
+    for row in rows:
+        r = row.row
+        ws.write(r, 0, row.text, formats[row.text_fmt])
+        if row.hist is not None:
+            ws.write_row(r, 1, hist[row.hist].tolist(), formats[row.hist_fmt])
+        if row.cells:
+            vals = lines[row.line].tolist()
+            fmt = formats[row.cell_fmt]
+            for col, formula, i in row.cells:
+                if formula is None:
+                    ws.write(r, col, 0, fmt)
+                else:
+                    ws.write_formula(r, col, formula, fmt, vals[i])
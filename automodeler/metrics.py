@@ -0,0 +1,147 @@
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+Hot-path instrumentation - per-stage timers, counters and structured logs.
+
+    with timed('fetch', ticker='AAPL'):
+        ...
+
+Every stage lands in a histogram (rendered as Prometheus text by render()) and is
+logged as one JSON line on the 'automodeler' logger. Numbers are per process.
+"""
+
+log = logging.getLogger('automodeler')
+
+# Histogram buckets in seconds, wide enough for a cold yfinance fetch
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def log_event(event, **fields):
+    """One JSON object per line so log shippers can parse it"""
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({'event': event, **fields}, default=str))
+
+
+class Metrics:
+    """Stage histograms, event counters and pull-style collectors (cache stats etc.)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.stages = {}    # stage -> {'count', 'sum', 'max', 'buckets': [...]}
+        self.counters = {}  # event -> count
+        self.collectors = {}  # name -> fn returning {stat: number}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            s = self.stages.get(stage)
+            if s is None:
+                s = self.stages[stage] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(self.buckets)}
+            s['count'] += 1
+            s['sum'] += seconds
+            s['max'] = max(s['max'], seconds)
+            for i, le in enumerate(self.buckets):
+                if seconds <= le:
+                    s['buckets'][i] += 1
+
+    def count(self, event, n=1):
+        with self._lock:
+            self.counters[event] = self.counters.get(event, 0) + n
+
+    def register(self, name, fn):
+        self.collectors[name] = fn
+
+    def snapshot(self):
+        with self._lock:
+            stages = {k: dict(v, buckets=list(v['buckets'])) for k, v in self.stages.items()}
+            counters = dict(self.counters)
+        collected = {}
+        for name, fn in self.collectors.items():
+            try:
+                collected[name] = dict(fn())
+            except Exception:
+                continue  # a broken collector shouldn't take /metrics down
+        return {'stages': stages, 'counters': counters, 'collected': collected}
+
+    def render(self):
+        """Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            '# HELP automodeler_stage_seconds Time spent per pipeline stage',
+            '# TYPE automodeler_stage_seconds histogram',
+        ]
+        for stage, s in sorted(snap['stages'].items()):
+            for le, n in zip(self.buckets, s['buckets']):
+                lines.append(f'automodeler_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {n}')
+            lines.append(f'automodeler_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {s["count"]}')
+            lines.append(f'automodeler_stage_seconds_sum{{stage="{stage}"}} {s["sum"]:.6f}')
+            lines.append(f'automodeler_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+
+        lines += ['# HELP automodeler_events_total Counted events', '# TYPE automodeler_events_total counter']
+        for event, n in sorted(snap['counters'].items()):
+            lines.append(f'automodeler_events_total{{event="{event}"}} {n}')
+
+        for name, stats in sorted(snap['collected'].items()):
+            metric = f'automodeler_{name}'
+            lines.append(f'# TYPE {metric} gauge')
+            for stat, value in sorted(stats.items()):
+                lines.append(f'{metric}{{stat="{stat}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def timed(stage, **fields):
+    """Time a block (or decorate a function), failures are counted as <stage>_error"""
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except Exception:
+        ok = False
+        metrics.count(f'{stage}_error')
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe(stage, seconds)
+        log_event('stage', stage=stage, seconds=round(seconds, 6), ok=ok, **fields)
+
+
+# cProfile capture, only available when AUTOMODELER_PROFILE_DIR is set
+PROFILE_DIR = os.environ.get('AUTOMODELER_PROFILE_DIR')
+_profile_armed = threading.Event()
+
+
+def arm_profile():
+    """Profile the next profiled() block, False when profiling is disabled"""
+    if not PROFILE_DIR:
+        return False
+    _profile_armed.set()
+    return True
+
+
+@contextmanager
+def profiled(name):
+    """Run the block under cProfile if armed, the .prof file goes to AUTOMODELER_PROFILE_DIR"""
+    if not PROFILE_DIR or not _profile_armed.is_set():
+        yield
+        return
+    _profile_armed.clear()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        log_event('profile', name=name, path=path)
@@ -0,0 +1,273 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+from automodeler.cache import BytesLRU, DataCache, SQLiteStore
+from automodeler.engine import compute_drivers, model_lines, year_labels
+from automodeler.layout import compile_layout, write_rows
+from automodeler.metrics import metrics, timed
+from automodeler.providers import (RateLimitedProvider, SharedTokenBucket, SingleFlight, TokenBucket,
+                                   YFinanceProvider, fetch_statements)
+from automodeler.scenarios import run_scenarios
+
+"""
+Modeling core - fetch and normalize statements, build the linked Excel model.
+Kept free of the web stack so batch jobs can import it.
+"""
+
+# Fetched statements are cached on disk, set AUTOMODELER_CACHE to move the file
+data_cache = DataCache(
+    SQLiteStore(os.environ.get('AUTOMODELER_CACHE', '.automodeler_cache.sqlite')),
+    ttl=int(os.environ.get('AUTOMODELER_CACHE_TTL', 24 * 60 * 60))
+)
+# One rate limit (statement calls per second) for every process on the host: web workers,
+# job processes and batch workers all draw from the same SQLite file. An empty
+# AUTOMODELER_RATE_DB makes the limit per process instead
+RATE_DB = os.environ.get('AUTOMODELER_RATE_DB', '.automodeler_rate.sqlite')
+_rate = float(os.environ.get('AUTOMODELER_RATE_LIMIT', 8))
+_burst = float(os.environ.get('AUTOMODELER_RATE_BURST', 16))
+upstream_limit = SharedTokenBucket(RATE_DB, _rate, _burst) if RATE_DB else TokenBucket(_rate, _burst)
+default_provider = RateLimitedProvider(YFinanceProvider(), upstream_limit)
+FETCH_TIMEOUT = float(os.environ.get('AUTOMODELER_FETCH_TIMEOUT', 30))
+# Concurrent requests for the same ticker wait on one fetch
+inflight = SingleFlight()
+
+# Bump whenever the workbook layout or formulas change, old cached files are then ignored
+TEMPLATE_VERSION = 1
+workbook_cache = BytesLRU(int(os.environ.get('AUTOMODELER_WORKBOOK_CACHE_MB', 64)) * 1024 * 1024)
+# Projections, scenario bands and workbooks built by job processes, read back by the web workers.
+# Keyed by content, so an entry stays valid for as long as the data it was built from
+artifact_cache = DataCache(
+    SQLiteStore(os.environ.get('AUTOMODELER_ARTIFACTS', '.automodeler_artifacts.sqlite'), max_entries=2000),
+    ttl=int(os.environ.get('AUTOMODELER_CACHE_TTL', 24 * 60 * 60)),
+    max_memory=64
+)
+
+metrics.register('data_cache', data_cache.stats)
+metrics.register('workbook_cache', workbook_cache.stats)
+metrics.register('artifact_cache', artifact_cache.stats)
+metrics.register('inflight', lambda: inflight.counters)
+
+def fetch_company_data(ticker_symbol, use_cache=True, provider=None, cancelled=None):
+    """
+    Get financials from yfinance (or the local cache).
+    The cache only holds default_provider results, passing another provider skips it.
+    cancelled: callable polled during the upstream calls (see fetch_statements), for jobs.
+    Callers sharing the fetch get the FetchCancelled too.
+    """
+    if provider is not None and provider is not default_provider:
+        use_cache = False
+    if use_cache:
+        cached = data_cache.get(ticker_symbol)
+        if cached is not None:
+            data, meta = cached
+            return data.copy(), dict(meta)
+
+    provider = provider or default_provider
+    data, meta = inflight.do(
+        (id(provider), ticker_symbol, use_cache),
+        lambda: _fetch_and_normalize(ticker_symbol, use_cache, provider, cancelled)
+    )
+    # Callers sharing one fetch each get their own copy
+    return data.copy(), dict(meta)
+
+def _fetch_and_normalize(ticker_symbol, use_cache, provider, cancelled=None):
+    if use_cache:
+        # Someone may have filled the cache while we waited to become the leader
+        cached = data_cache.get(ticker_symbol)
+        if cached is not None:
+            return cached
+
+    with timed('fetch', ticker=ticker_symbol):
+        raw = fetch_statements(provider, ticker_symbol, timeout=FETCH_TIMEOUT, cancelled=cancelled)
+
+    with timed('normalize', ticker=ticker_symbol):
+        data, meta = _normalize(ticker_symbol, raw)
+
+    if use_cache:
+        data_cache.set(ticker_symbol, (data.copy(), dict(meta)))
+    return data, meta
+
+def _normalize(ticker_symbol, raw):
+    is_df = raw['financials'].T.sort_index()
+    bs_df = raw['balance_sheet'].T.sort_index()
+    cf_df = raw['cashflow'].T.sort_index()
+    
+    if is_df.empty:
+        raise ValueError(f"Can't find {ticker_symbol}")
+
+    def get_col(df, keys):
+        # Yfinance sometimes uses different column names
+        for k in keys:
+            if k in df.columns:
+                return df[k].fillna(0)
+        return pd.Series(0, index=df.index)
+
+    data = pd.DataFrame(index=is_df.index)
+    
+    # Pull income statement
+    data['Revenue'] = get_col(is_df, ['Total Revenue', 'TotalRevenue'])
+    data['COGS'] = get_col(is_df, ['Cost Of Revenue', 'CostOfRevenue'])
+    data['SG&A'] = get_col(is_df, ['Selling General And Administration', 'Operating Expense'])
+    data['Interest'] = get_col(is_df, ['Interest Expense', 'InterestExpense'])
+    data['Tax'] = get_col(is_df, ['Tax Provision', 'TaxProvision'])
+    data['Net Income'] = get_col(is_df, ['Net Income', 'NetIncome'])
+    
+    # Balance sheet
+    data['Cash'] = get_col(bs_df, ['Cash And Cash Equivalents', 'CashAndCashEquivalents'])
+    data['AR'] = get_col(bs_df, ['Receivables', 'AccountsReceivable', 'NetReceivables'])
+    data['PP&E'] = get_col(bs_df, ['Net PPE', 'NetPPE', 'Gross PPE'])
+    data['Total Assets'] = get_col(bs_df, ['Total Assets', 'TotalAssets'])
+    data['AP'] = get_col(bs_df, ['Accounts Payable', 'AccountsPayable', 'Payables'])
+    data['Debt'] = get_col(bs_df, ['Total Debt', 'TotalDebt', 'Long Term Debt'])
+    data['Total Liab'] = get_col(bs_df, ['Total Liabilities Net Minority Interest', 'TotalLiabilities'])
+    data['Share Capital'] = get_col(bs_df, ['Common Stock', 'CommonStock', 'ShareIssued'])
+    data['Retained Earnings'] = get_col(bs_df, ['Retained Earnings', 'RetainedEarnings'])
+    
+    # Calculate plugs
+    data['Other Assets'] = data['Total Assets'] - (data['Cash'] + data['AR'] + data['PP&E'])
+    data['Total Equity'] = get_col(bs_df, ['Stockholders Equity', 'StockholdersEquity'])
+    data['Other Liab'] = data['Total Liab'] - (data['AP'] + data['Debt'])
+    
+    # Cash flow
+    data['D&A'] = get_col(cf_df, ['Depreciation And Amortization', 'Depreciation'])
+    data['Capex'] = get_col(cf_df, ['Capital Expenditure', 'CapitalExpenditure'])
+    data['Operating Cash Flow'] = get_col(cf_df, ['Operating Cash Flow', 'OperatingCashFlow'])
+    
+    data = data.fillna(0)
+    
+    # Get company info
+    info = raw['info'] or {}
+    meta = {
+        'name': info.get('shortName', ticker_symbol),
+        'sector': info.get('sector', 'Unknown'),
+        'industry': info.get('industry', 'Unknown'),
+        'currency': info.get('currency', 'USD')
+    }
+    return data, meta
+
+def data_version(hist_data, meta):
+    """Content hash of normalized data and meta, changes whenever the numbers do"""
+    h = hashlib.sha256()
+    h.update(json.dumps(meta, sort_keys=True, default=str).encode())
+    h.update('|'.join(map(str, hist_data.columns)).encode())
+    h.update(pd.util.hash_pandas_object(hist_data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def workbook_key(hist_data, meta, scenarios=False):
+    """Cache key for a built workbook: data version plus everything that shapes the file"""
+    return f"v{TEMPLATE_VERSION}|{int(bool(scenarios))}|{data_version(hist_data, meta)}"
+
+def workbook_bytes(hist_data, meta, scenarios=False):
+    """xlsx bytes for already fetched data, served from workbook_cache when identical"""
+    key = workbook_key(hist_data, meta, scenarios)
+    data = workbook_cache.get(key)
+    if data is None:
+        data = stored_workbook(hist_data, meta, scenarios)
+        workbook_cache.set(key, data)
+    return data
+
+def stored_workbook(hist_data, meta, scenarios=False):
+    """xlsx bytes from artifact_cache, where jobs leave them, built and stored on a miss"""
+    key = workbook_key(hist_data, meta, scenarios)
+    data = artifact_cache.get(key)
+    if data is None:
+        bands = scenario_bands(hist_data, meta) if scenarios else None
+        data = build_workbook(hist_data, meta, scenarios, bands=bands).getvalue()
+        artifact_cache.set(key, data)
+    return data
+
+def _artifact(kind, hist_data, meta, build):
+    key = f"v{TEMPLATE_VERSION}|{kind}|{data_version(hist_data, meta)}"
+    value = artifact_cache.get(key)
+    if value is None:
+        value = build()
+        artifact_cache.set(key, value)
+    return value
+
+def projected_lines(hist_data, meta):
+    """model_lines for already fetched data, shared through artifact_cache"""
+    return _artifact('lines', hist_data, meta, lambda: model_lines(hist_data))
+
+def scenario_bands(hist_data, meta):
+    """run_scenarios for already fetched data, shared through artifact_cache"""
+    return _artifact('scenarios', hist_data, meta, lambda: run_scenarios(hist_data))
+
+def generate_excel_file(ticker, use_cache=True, scenarios=False, constant_memory=False):
+    try:
+        hist_data, meta = fetch_company_data(ticker, use_cache=use_cache)
+    except Exception as e:
+        return None, None, str(e)
+
+    return build_workbook(hist_data, meta, scenarios, constant_memory), hist_data, meta
+
+@timed('workbook_build')
+def build_workbook(hist_data, meta, scenarios=False, constant_memory=False, bands=None):
+    """
+    Write the Assumptions/Model (and optional Scenarios) sheets into a BytesIO.
+    constant_memory streams rows through temp files instead of keeping the sheets in memory, for batches.
+    bands: run_scenarios(hist_data) if already computed.
+    """
+    import xlsxwriter  # only needed once a workbook is actually built
+
+    output = io.BytesIO()
+    options = {'constant_memory': True} if constant_memory else {'in_memory': True}
+    workbook = xlsxwriter.Workbook(output, options)
+    
+    # Workbook formats
+    header_fmt = workbook.add_format({'bold': True, 'bg_color': '#2F5597', 'font_color': 'white', 'align': 'center', 'border': 1})
+    blue_fmt = workbook.add_format({'font_color': '#0000FF', 'num_format': '#,##0'}) 
+    black_fmt = workbook.add_format({'font_color': '#000000', 'num_format': '#,##0'}) 
+    pct_fmt = workbook.add_format({'font_color': '#0000FF', 'num_format': '0.0%'})
+    bold_fmt = workbook.add_format({'bold': True})
+    title_fmt = workbook.add_format({'bold': True, 'font_size': 14, 'font_color': '#2F5597'})
+    formats = {None: None, 'blue': blue_fmt, 'black': black_fmt, 'pct': pct_fmt, 'bold': bold_fmt}
+
+    ws_inputs = workbook.add_worksheet('Assumptions')
+    ws_model = workbook.add_worksheet('Model')
+    
+    # Set up timeline
+    hist_years, proj_years = year_labels(hist_data)
+    all_years = hist_years + proj_years
+    proj_cols = len(proj_years)
+    # Rows and formulas only depend on the period counts, compiled once per shape
+    layout = compile_layout(len(hist_years), proj_cols)
+    
+    drivers = compute_drivers(hist_data)
+    # Engine results go in as cached formula values so the file opens calculated
+    values = model_lines(hist_data, drivers)
+    
+    # Assumptions sheet
+    ws_inputs.set_column('A:A', 30)
+    ws_inputs.write(0, 0, f"{meta['name']} Drivers", title_fmt)
+    ws_inputs.write_row(2, 1, all_years, header_fmt)
+    write_rows(ws_inputs, layout.assumptions, drivers, drivers, formats)
+
+    ws_model.set_column('A:A', 35)
+    ws_model.set_column(1, len(all_years), 14)
+    ws_model.write(0, 0, f"{meta['name']} 3-Statement Model", title_fmt)
+    ws_model.write_row(2, 1, all_years, header_fmt)
+    write_rows(ws_model, layout.model, hist_data, values, formats)
+
+    if scenarios:
+        # Monte Carlo percentile bands, values only
+        ws_sc = workbook.add_worksheet('Scenarios')
+        ws_sc.set_column('A:A', 30)
+        ws_sc.set_column(1, proj_cols, 14)
+        ws_sc.write(0, 0, f"{meta['name']} Scenario Bands", title_fmt)
+        r = 2
+        for metric, band in (bands if bands is not None else run_scenarios(hist_data)).items():
+            ws_sc.write(r, 0, metric, header_fmt)
+            ws_sc.write_row(r, 1, list(band.columns), header_fmt)
+            for pct, row in band.iterrows():
+                r += 1
+                ws_sc.write(r, 0, pct, bold_fmt)
+                ws_sc.write_row(r, 1, row.tolist(), black_fmt)
+            r += 2
+
+    workbook.close()
+    output.seek(0)
+    return output
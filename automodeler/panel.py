@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+"""
+Columnar panel store - normalized fundamentals for the whole universe in one
+memory-mapped float64 array (ticker x period x line item).
+
+    panel/index.json     tickers, period end dates, line items and the values file, in array order
+    panel/values.N.f64   raw C-order float64, NaN where a ticker has no such period
+
+Periods are every period end date seen across the universe, so quarterly histories and
+off-calendar fiscal years keep one row per reported period.
+
+Ticker-major layout means adding a ticker is a file append and updating one is an
+in-place write. A new period end changes the shape, so the values are rewritten into the
+next values.N.f64 and the index switches to it in one rename.
+Loading maps the file read-only, nothing is deserialized.
+Single writer: run appends from one process at a time.
+"""
+
+# Same line items fetch_company_data produces
+ITEMS = [
+    'Revenue', 'COGS', 'SG&A', 'Interest', 'Tax', 'Net Income',
+    'Cash', 'AR', 'PP&E', 'Total Assets', 'AP', 'Debt', 'Total Liab',
+    'Share Capital', 'Retained Earnings', 'Other Assets', 'Total Equity', 'Other Liab',
+    'D&A', 'Capex', 'Operating Cash Flow'
+]
+
+INDEX_FILE = 'index.json'
+VALUES_FILE = 'values.f64'  # before the first relayout, later files are values.N.f64
+INDEX_VERSION = 2  # 1 keyed periods by calendar year
+
+
+def fiscal_year(period_end):
+    """Fiscal year a period end belongs to: years ending January to May count as the year before"""
+    date = pd.Timestamp(period_end)
+    return date.year - 1 if date.month <= 5 else date.year
+
+
+def _safe_ratio(num, den):
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(den))
+    return out
+
+
+def _period_keys(hist_data):
+    return [d.strftime('%Y-%m-%d') for d in pd.to_datetime(hist_data.index)]
+
+
+class Panel:
+    """Read-only view of the store, values is a (tickers, periods, items) memmap"""
+
+    def __init__(self, values, tickers, periods, items):
+        self.values = values
+        self.tickers = tickers
+        self.periods = periods
+        self.items = items
+        self.ticker_index = {t: i for i, t in enumerate(tickers)}
+        self.item_index = {k: i for i, k in enumerate(items)}
+
+    def item(self, name):
+        """(tickers, periods) slice for one line item"""
+        return self.values[:, :, self.item_index[name]]
+
+    def frame(self, ticker):
+        """One ticker back as a periods x items DataFrame"""
+        block = self.values[self.ticker_index[ticker]]
+        df = pd.DataFrame(np.array(block), index=pd.to_datetime(self.periods), columns=self.items)
+        return df.dropna(how='all')
+
+    def latest_index(self, back=0):
+        """
+        Position of each ticker's latest period with reported revenue, -1 if none.
+        back=1 gives the period reported before that one, and so on.
+        """
+        valid = ~np.isnan(self.item('Revenue'))
+        # Reported periods at or after each position, counted from the end
+        from_end = np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]
+        hit = valid & (from_end == back + 1)
+        return np.where(hit.any(axis=1), np.argmax(hit, axis=1), -1)
+
+    def _at(self, name, idx):
+        vals = self.item(name)
+        rows = np.arange(len(self.tickers))
+        out = vals[rows, np.maximum(idx, 0)]
+        return np.where(idx >= 0, out, np.nan)
+
+    def latest(self, name):
+        """Latest reported value of a line item for every ticker"""
+        return pd.Series(self._at(name, self.latest_index()), index=self.tickers, name=name)
+
+    def cross_section(self, period, names=None):
+        """
+        All tickers for one period, tickers x items.
+        period: a period end ('2024-12-31'), or a fiscal year (2024) to take each
+        ticker's latest period in that year (see fiscal_year).
+        """
+        if isinstance(period, (int, np.integer)):
+            cols = [i for i, p in enumerate(self.periods) if fiscal_year(p) == period]
+            block = np.full((len(self.tickers), len(self.items)), np.nan)
+            for i in cols:  # later periods overwrite earlier ones where reported
+                vals = np.array(self.values[:, i, :])
+                reported = ~np.isnan(vals).all(axis=1)
+                block[reported] = vals[reported]
+        else:
+            block = np.array(self.values[:, self.periods.index(pd.Timestamp(period).strftime('%Y-%m-%d')), :])
+        df = pd.DataFrame(block, index=self.tickers, columns=self.items)
+        return df[names] if names else df
+
+    def net_margin(self):
+        idx = self.latest_index()
+        return pd.Series(_safe_ratio(self._at('Net Income', idx), self._at('Revenue', idx)),
+                         index=self.tickers, name='Net Margin')
+
+    def debt_to_equity(self):
+        idx = self.latest_index()
+        return pd.Series(_safe_ratio(self._at('Debt', idx), self._at('Total Equity', idx)),
+                         index=self.tickers, name='D/E')
+
+    def revenue_growth(self):
+        """Latest revenue against each ticker's previous reported period"""
+        idx = self.latest_index()
+        prev = self.latest_index(back=1)
+        return pd.Series(_safe_ratio(self._at('Revenue', idx), self._at('Revenue', prev)) - 1,
+                         index=self.tickers, name='Revenue Growth')
+
+
+class PanelStore:
+    """Append-friendly on-disk panel, see module docstring for the layout"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self):
+        path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(path):
+            return {'version': INDEX_VERSION, 'tickers': [], 'periods': [], 'items': list(ITEMS),
+                    'values': VALUES_FILE, 'generation': 0}
+        with open(path) as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError(f"{self.path} was written by an older version (one row per calendar year), "
+                             "delete it and add the tickers again")
+        index.setdefault('values', VALUES_FILE)
+        index.setdefault('generation', 0)
+        return index
+
+    def _write_index(self):
+        # Written after the values so readers never see tickers without data, or a values
+        # file laid out for other periods
+        tmp = os.path.join(self.path, INDEX_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+    @property
+    def _values_path(self):
+        return os.path.join(self.path, self._index['values'])
+
+    def _shape(self, n_tickers=None):
+        idx = self._index
+        return (len(idx['tickers']) if n_tickers is None else n_tickers, len(idx['periods']), len(idx['items']))
+
+    def _block(self, hist_data, periods):
+        # periods x items array for one ticker, NaN where it has no data
+        items = self._index['items']
+        block = np.full((len(periods), len(items)), np.nan)
+        frame = hist_data.reindex(columns=items)
+        pos = {p: i for i, p in enumerate(periods)}
+        for period, row in zip(_period_keys(frame), frame.to_numpy(dtype=float)):
+            block[pos[period]] = row
+        return block
+
+    def _relayout(self, periods):
+        """
+        New period ends widen every ticker's slab, rewrite the values once into a new file.
+        Returns the old file, to delete once the index no longer names it.
+        """
+        old_periods = self._index['periods']
+        shape = self._shape()
+        new = np.full((shape[0], len(periods), shape[2]), np.nan)
+        if shape[0] and old_periods:
+            old = np.memmap(self._values_path, dtype=np.float64, mode='r', shape=shape)
+            new[:, [periods.index(p) for p in old_periods], :] = old
+            del old
+        old_path = self._values_path
+        generation = self._index['generation'] + 1
+        new_name = f'values.{generation}.f64'
+        new.tofile(os.path.join(self.path, new_name))
+        self._index.update(periods=periods, values=new_name, generation=generation)
+        return old_path
+
+    def append(self, hist_by_ticker):
+        """Add or replace tickers, {ticker: hist_data from fetch_company_data}"""
+        if not hist_by_ticker:
+            return
+        periods = set(self._index['periods'])
+        for ticker, df in hist_by_ticker.items():
+            keys = _period_keys(df)
+            if len(set(keys)) != len(keys):
+                raise ValueError(f"{ticker}: more than one row for the same period end")
+            periods.update(keys)
+        periods = sorted(periods)
+        replaced = None
+        if periods != self._index['periods']:
+            replaced = self._relayout(periods)
+
+        tickers = self._index['tickers']
+        pos = {t: i for i, t in enumerate(tickers)}
+        updates = {t: df for t, df in hist_by_ticker.items() if t in pos}
+        added = [t for t in hist_by_ticker if t not in pos]
+
+        if updates:
+            values = np.memmap(self._values_path, dtype=np.float64, mode='r+', shape=self._shape())
+            for t, df in updates.items():
+                values[pos[t]] = self._block(df, periods)
+            values.flush()
+            del values
+
+        if added:
+            with open(self._values_path, 'ab') as f:
+                for t in added:
+                    self._block(hist_by_ticker[t], periods).tofile(f)
+            tickers.extend(added)
+
+        self._write_index()
+        if replaced is not None and os.path.exists(replaced):
+            os.remove(replaced)  # readers that already mapped it keep their view
+
+    def load(self):
+        """Map the whole universe read-only"""
+        for attempt in range(3):
+            self._index = self._read_index()
+            shape = self._shape()
+            if shape[0] == 0:
+                values = np.empty(shape)
+                break
+            try:
+                values = np.memmap(self._values_path, dtype=np.float64, mode='r', shape=shape)
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+                # A writer swapped in a new values file between our index read and the open
+        idx = self._index
+        return Panel(values, list(idx['tickers']), list(idx['periods']), list(idx['items']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and screen the fundamentals panel store")
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help="fetch tickers and append them to the panel")
+    add.add_argument('panel', help="panel directory")
+    add.add_argument('tickers', help="file with one ticker per line")
+    screen = sub.add_parser('screen', help="print latest net margin, D/E and revenue growth")
+    screen.add_argument('panel', help="panel directory")
+    args = parser.parse_args(argv)
+
+    if args.command == 'add':
+        from automodeler.batch import read_tickers
+        from automodeler.model import fetch_company_data
+
+        store = PanelStore(args.panel)
+        batch, failed = {}, 0
+        for ticker in read_tickers(args.tickers):
+            try:
+                batch[ticker], _ = fetch_company_data(ticker)
+            except Exception as e:
+                failed += 1
+                print(f"{ticker}: {e}", file=sys.stderr)
+            if len(batch) >= 100:
+                store.append(batch)
+                batch = {}
+        store.append(batch)
+        return 1 if failed else 0
+
+    panel = PanelStore(args.panel).load()
+    table = pd.concat([panel.net_margin(), panel.debt_to_equity(), panel.revenue_growth()], axis=1)
+    print(table.to_string(float_format=lambda x: f"{x:.3f}"))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
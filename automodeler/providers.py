@@ -0,0 +1,292 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import pandas as pd
+
+from automodeler.cache import SQLiteFile
+
+"""
+Data providers - where the raw statements come from.
+Statements are fetched concurrently so a model waits on the slowest call, not the sum.
+Upstream load is capped by a token bucket shared by every process on the host, and concurrent
+fetches of one ticker are coalesced.
+"""
+
+STATEMENTS = ('financials', 'balance_sheet', 'cashflow', 'info')
+
+# Shared by every request so concurrent users can't spawn unbounded threads
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='fetch')
+
+
+def _reset_pool():
+    # A forked child inherits the executor but not its threads, queued calls would never run
+    global _pool
+    _pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='fetch')
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+
+class FetchError(RuntimeError):
+    """One of the upstream statement calls failed or timed out"""
+
+
+class FetchCancelled(FetchError):
+    """The caller asked to stop before every statement came back"""
+
+
+class DataProvider:
+    """Returns yfinance-shaped statements (line items as rows, periods as columns)"""
+
+    def call(self, name, ticker, deadline=None):
+        """One statement call, deadline is a time.monotonic() value wrappers may honour"""
+        return getattr(self, name)(ticker)
+
+    def is_transient(self, error):
+        """Whether a failed call is worth retrying (network trouble, throttling)"""
+        return isinstance(error, OSError)
+
+    def financials(self, ticker):
+        raise NotImplementedError
+
+    def balance_sheet(self, ticker):
+        raise NotImplementedError
+
+    def cashflow(self, ticker):
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    # yfinance is slow to import, load it on the first fetch rather than at startup
+    def _ticker(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker)
+
+    def financials(self, ticker):
+        return self._ticker(ticker).financials
+
+    def balance_sheet(self, ticker):
+        return self._ticker(ticker).balance_sheet
+
+    def cashflow(self, ticker):
+        return self._ticker(ticker).cashflow
+
+    def info(self, ticker):
+        return self._ticker(ticker).info
+
+    def is_transient(self, error):
+        from yfinance.exceptions import YFRateLimitError
+        return isinstance(error, (OSError, YFRateLimitError))
+
+
+class FakeProvider(DataProvider):
+    """Serves canned statements with optional latency, for tests and benchmarks"""
+
+    def __init__(self, statements, latency=0.0):
+        # statements: {ticker: {'financials': df, 'balance_sheet': df, 'cashflow': df, 'info': dict}}
+        # latency: seconds per call, or {statement name: seconds}
+        self.statements = statements
+        self.latency = latency
+        self.calls = {name: 0 for name in STATEMENTS}
+        self._lock = threading.Lock()
+
+    def _get(self, name, ticker):
+        with self._lock:
+            self.calls[name] += 1
+        delay = self.latency.get(name, 0.0) if isinstance(self.latency, dict) else self.latency
+        if delay:
+            time.sleep(delay)
+        entry = self.statements.get(ticker)
+        if entry is None:
+            return {} if name == 'info' else pd.DataFrame()
+        return entry[name]
+
+    def financials(self, ticker):
+        return self._get('financials', ticker)
+
+    def balance_sheet(self, ticker):
+        return self._get('balance_sheet', ticker)
+
+    def cashflow(self, ticker):
+        return self._get('cashflow', ticker)
+
+    def info(self, ticker):
+        return self._get('info', ticker)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Block until a token is available, False if that would take longer than timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def _take(self):
+        # Take a token and return 0, or return the seconds until one is due
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket kept in a SQLite file, so every process using the file shares one budget"""
+
+    def __init__(self, path, rate, capacity=None):
+        super().__init__(rate, capacity)
+        self.path = path
+        self._db = SQLiteFile(path, ["CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY, tokens REAL, updated REAL)"])
+
+    def _take(self):
+        with self._db.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # no other process between the read and the write
+            now = time.time()  # wall clock, monotonic clocks aren't comparable across processes
+            row = conn.execute("SELECT tokens, updated FROM bucket WHERE id = 0").fetchone()
+            tokens = self.capacity if row is None else min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute("INSERT OR REPLACE INTO bucket (id, tokens, updated) VALUES (0, ?, ?)", (tokens, now))
+        return wait
+
+
+class RateLimitedProvider(DataProvider):
+    """Wraps a provider so every call takes a token from a shared bucket and retries with backoff"""
+
+    def __init__(self, provider, bucket, retries=3, backoff=0.5):
+        self.provider = provider
+        self.bucket = bucket
+        self.retries = retries
+        self.backoff = backoff
+
+    def call(self, name, ticker, deadline=None):
+        """Take a token and call upstream, giving up rather than starting after deadline"""
+        for attempt in range(self.retries + 1):
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                # Re-checked after the wait: the token may only have come due at the deadline
+                if timeout <= 0 or not self.bucket.acquire(timeout) or time.monotonic() >= deadline:
+                    raise FetchError(f"{ticker}: {name} could not start before the deadline")
+            else:
+                self.bucket.acquire()
+            try:
+                return self.provider.call(name, ticker, deadline)
+            except Exception as e:
+                if attempt == self.retries or not self.provider.is_transient(e):
+                    raise
+                # Exponential backoff with jitter so retries from many threads don't line up
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise
+                time.sleep(delay)
+
+    def is_transient(self, error):
+        return self.provider.is_transient(error)
+
+    def financials(self, ticker):
+        return self.call('financials', ticker)
+
+    def balance_sheet(self, ticker):
+        return self.call('balance_sheet', ticker)
+
+    def cashflow(self, ticker):
+        return self.call('cashflow', ticker)
+
+    def info(self, ticker):
+        return self.call('info', ticker)
+
+
+class SingleFlight:
+    """Concurrent do(key, fn) calls for the same key share one execution of fn"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = {'executed': 0, 'shared': 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.counters['executed'] += 1
+            else:
+                self.counters['shared'] += 1
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        return call['result']
+
+
+def fetch_statements(provider, ticker, timeout=30, cancelled=None):
+    """
+    Run the four statement calls in parallel, returns {name: result}.
+    cancelled: optional callable polled while waiting, FetchCancelled once it returns True.
+    Calls already running upstream finish in the background, their results are dropped.
+    """
+    start = time.monotonic()
+    # Calls still queued in the pool when we give up won't start (or take a token) after the deadline
+    deadline = start + timeout
+    futures = {name: _pool.submit(provider.call, name, ticker, deadline) for name in STATEMENTS}
+
+    results = {}
+    try:
+        for name, future in futures.items():
+            while True:
+                remaining = max(0.0, timeout - (time.monotonic() - start))
+                try:
+                    results[name] = future.result(timeout=remaining if cancelled is None else min(remaining, 0.25))
+                    break
+                except FutureTimeout:
+                    if remaining <= 0.25 or cancelled is None:
+                        raise FetchError(f"{ticker}: {name} timed out after {timeout}s") from None
+                    if cancelled():
+                        raise FetchCancelled(f"{ticker}: fetch cancelled") from None
+                except Exception as e:
+                    raise FetchError(f"{ticker}: {name} failed ({e})") from e
+    finally:
+        # Don't leave queued calls behind once we've given up
+        for future in futures.values():
+            future.cancel()
+    return results
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from automodeler import model
+from automodeler.batch import model_path, read_tickers, run_pool
+from automodeler.model import build_workbook, data_version, fetch_company_data
+
+"""
+Incremental refresh - only rebuild tickers whose statements actually changed.
+
+    python -m automodeler.refresh tickers.txt -o models/ --workers 8 --rate 2
+
+Each ticker is first probed with a single income statement call. If its latest fiscal
+period hasn't moved (and the last full check is recent) nothing else is fetched.
+Otherwise the statements are fetched, fingerprinted and compared with the previous run,
+and the workbook is rebuilt only if something changed.
+"""
+
+STATE_FILE = 'fingerprints.json'
+REPORT_FILE = 'refresh.jsonl'
+
+
+def load_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(out_dir, state):
+    tmp = os.path.join(out_dir, STATE_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, STATE_FILE))
+
+
+def fingerprint(hist_data, meta):
+    """Everything needed to tell what changed next time"""
+    row_hashes = pd.util.hash_pandas_object(hist_data, index=True)
+    return {
+        'fingerprint': data_version(hist_data, meta),
+        'latest_period': hist_data.index.max().strftime('%Y-%m-%d'),
+        'periods': {d.strftime('%Y-%m-%d'): str(h) for d, h in zip(hist_data.index, row_hashes)},
+        'items': [c for c in hist_data.columns if hist_data[c].any()],
+    }
+
+
+def diff(old, new):
+    """What changed between two fingerprints: new periods, restated periods, new line items"""
+    if old is None:
+        return {'new_ticker': True}
+    changes = {}
+    new_periods = sorted(set(new['periods']) - set(old['periods']))
+    restated = sorted(p for p in set(new['periods']) & set(old['periods']) if new['periods'][p] != old['periods'][p])
+    new_items = [c for c in new['items'] if c not in old['items']]
+    if new_periods:
+        changes['new_periods'] = new_periods
+    if restated:
+        changes['restated'] = restated
+    if new_items:
+        changes['new_items'] = new_items
+    if not changes and new['fingerprint'] != old['fingerprint']:
+        changes['other'] = True  # e.g. company name or sector
+    return changes
+
+
+def probe_latest_period(ticker, provider=None):
+    """Latest fiscal period end from the income statement alone (one upstream call)"""
+    raw = (provider or model.default_provider).financials(ticker)
+    if raw is None or raw.empty:
+        raise ValueError(f"Can't find {ticker}")
+    return pd.Timestamp(raw.columns.max()).strftime('%Y-%m-%d')
+
+
+def refresh_ticker(ticker, out_dir, previous, full_check_days=7.0, scenarios=False):
+    """Probe, then fetch/rebuild only if needed. Returns (report record, new state or None, data or None)"""
+    start = time.time()
+    record = {'ticker': ticker, 'status': 'unchanged', 'changes': {}, 'error': None}
+    try:
+        workbook_exists = os.path.exists(model_path(out_dir, ticker))
+        recent = previous and time.time() - previous.get('checked', 0) < full_check_days * 86400
+        if previous and recent and workbook_exists:
+            if probe_latest_period(ticker) == previous['latest_period']:
+                record['seconds'] = round(time.time() - start, 3)
+                return record, None, None
+
+        df, meta = fetch_company_data(ticker, use_cache=False)
+        state = fingerprint(df, meta)
+        state['checked'] = time.time()
+        changes = diff(previous, state)
+
+        if changes or not workbook_exists:
+            path = model_path(out_dir, ticker)
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(build_workbook(df, meta, scenarios, constant_memory=True).getbuffer())
+            os.replace(tmp, path)
+            record['status'] = 'rebuilt'
+            record['changes'] = changes or {'missing_workbook': True}
+        record['seconds'] = round(time.time() - start, 3)
+        return record, state, (df if changes else None)
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = str(e)
+        record['seconds'] = round(time.time() - start, 3)
+        return record, None, None
+
+
+def run_refresh(tickers, out_dir, workers=4, rate=None, full_check_days=7.0, scenarios=False,
+                panel=None, on_record=None):
+    """Refresh tickers across a process pool, returns the report records"""
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+
+    records, changed_data = [], {}
+    jobs = ((t, (t, out_dir, state.get(t), full_check_days, scenarios)) for t in tickers)
+    with open(os.path.join(out_dir, REPORT_FILE), 'a') as report:
+        for n, (ticker, result, error) in enumerate(run_pool(refresh_ticker, jobs, workers, rate), 1):
+            if error is None:
+                record, new_state, df = result
+            else:
+                record, new_state, df = {'ticker': ticker, 'status': 'failed', 'changes': {},
+                                         'error': str(error), 'seconds': None}, None, None
+            if new_state is not None:
+                state[ticker] = new_state
+            if df is not None:
+                changed_data[ticker] = df
+            record['finished'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            report.write(json.dumps(record) + '\n')
+            report.flush()
+            records.append(record)
+            if on_record:
+                on_record(record)
+            if n % 100 == 0:
+                save_state(out_dir, state)  # keep progress if we get interrupted
+
+    save_state(out_dir, state)
+    if panel and changed_data:
+        from automodeler.panel import PanelStore
+        PanelStore(panel).append(changed_data)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild models only for tickers whose statements changed")
+    parser.add_argument('tickers', help="file with one ticker per line")
+    parser.add_argument('-o', '--output', default='models', help="output directory (default: models)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 4, help="worker processes")
+    parser.add_argument('--rate', type=float, default=None, help="max tickers started per second across all workers")
+    parser.add_argument('--full-check-days', type=float, default=7.0,
+                        help="refetch everything after this many days even if no new period (catches restatements)")
+    parser.add_argument('--scenarios', action='store_true', help="add a Monte Carlo Scenarios sheet")
+    parser.add_argument('--panel', default=None, help="also update this panel store with changed tickers")
+    args = parser.parse_args(argv)
+
+    def report(record):
+        if record['status'] == 'failed':
+            detail = f"FAILED: {record['error']}"
+        else:
+            detail = ', '.join(f"{k}={v}" if v is not True else k for k, v in record['changes'].items())
+        print(f"{record['ticker']:<8} {record['status']:<9} {detail}", flush=True)
+
+    records = run_refresh(read_tickers(args.tickers), args.output, workers=args.workers, rate=args.rate,
+                          full_check_days=args.full_check_days, scenarios=args.scenarios,
+                          panel=args.panel, on_record=report)
+    counts = {}
+    for r in records:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    print("Done: " + ", ".join(f"{v} {k}" for k, v in sorted(counts.items())))
+    return 1 if counts.get('failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from automodeler.engine import DRIVERS, PROJ_YEARS, compute_drivers, year_labels
+
+"""
+Monte Carlo scenarios over the Assumptions drivers.
+Every path and year is one slot in a (paths, years) array, so 10k paths is a handful of vector ops.
+"""
+
+PERCENTILES = (5, 25, 50, 75, 95)
+METRICS = ("Revenue", "Net Income", "Retained Earnings")
+
+# Keep sampled drivers inside sensible bounds
+_BOUNDS = {
+    "Revenue Growth %": (-1.0, None),
+    "COGS % of Revenue": (0.0, None),
+    "SG&A % of Revenue": (0.0, None),
+    "Tax Rate %": (0.0, 1.0),
+    "D&A % of PP&E": (0.0, 1.0),
+    "Capex % of Revenue": (0.0, None),
+}
+
+
+def driver_distributions(hist_data):
+    """Mean and std of each driver over the ticker's history"""
+    drivers = compute_drivers(hist_data)
+    stats = {}
+    for name in DRIVERS:
+        vals = drivers[name].to_numpy()
+        if name == "Revenue Growth %" and len(vals) > 1:
+            vals = vals[1:]  # first period has no prior year
+        stats[name] = (float(vals.mean()), float(vals.std()))
+    return pd.DataFrame(stats, index=['mean', 'std']).T
+
+
+def sample_drivers(dists, n_paths, years=PROJ_YEARS, seed=None):
+    """{driver: array (n_paths, years)} drawn from independent normals"""
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name in DRIVERS:
+        mean, std = dists.loc[name, 'mean'], dists.loc[name, 'std']
+        draws = rng.normal(mean, std, size=(n_paths, years))
+        lo, hi = _BOUNDS[name]
+        samples[name] = np.clip(draws, lo, hi)
+    return samples
+
+
+def simulate(hist_data, samples):
+    """
+    Roll every path forward, returns {metric: array (n_paths, years)}.
+    Same mechanics as the Model sheet, except D&A follows the sampled D&A % of PP&E
+    and PP&E moves with Capex, so all six drivers feed the result.
+    """
+    last = hist_data.iloc[-1]
+    n_paths, years = samples["Revenue Growth %"].shape
+
+    rev = np.full(n_paths, float(last['Revenue']))
+    ppe = np.full(n_paths, float(last['PP&E']))
+    re = np.full(n_paths, float(last['Retained Earnings']))
+    out = {m: np.empty((n_paths, years)) for m in METRICS}
+
+    for t in range(years):
+        rev = rev * (1 + samples["Revenue Growth %"][:, t])
+        da = ppe * samples["D&A % of PP&E"][:, t]
+        ppe = ppe + rev * samples["Capex % of Revenue"][:, t] - da
+        ebt = rev * (1 - samples["COGS % of Revenue"][:, t] - samples["SG&A % of Revenue"][:, t]) - da
+        ni = ebt * (1 - samples["Tax Rate %"][:, t])
+        re = re + ni
+
+        out["Revenue"][:, t] = rev
+        out["Net Income"][:, t] = ni
+        out["Retained Earnings"][:, t] = re
+    return out
+
+
+def run_scenarios(hist_data, n_paths=10000, years=PROJ_YEARS, seed=0, percentiles=PERCENTILES):
+    """Percentile bands per metric: {metric: DataFrame (P5..P95 x projection years)}"""
+    samples = sample_drivers(driver_distributions(hist_data), n_paths, years, seed)
+    paths = simulate(hist_data, samples)
+    _, proj_years = year_labels(hist_data, years)
+    index = [f"P{p}" for p in percentiles]
+    return {
+        m: pd.DataFrame(np.percentile(vals, percentiles, axis=0), index=index, columns=proj_years)
+        for m, vals in paths.items()
+    }
@@ -0,0 +1,61 @@
+import os
+import pickle
+import time
+
+from automodeler.cache import DataCache, SQLiteStore
+
+"""
+Per-session dashboard state (ticker, fetched data, projections).
+The memory backend is for a single process, the SQLite one is shared by every gunicorn worker.
+"""
+
+SESSION_TTL = 4 * 60 * 60  # idle sessions drop out after this
+
+
+class MemorySessionStore:
+    """Bounded LRU of session state, local to this process"""
+
+    def __init__(self, max_sessions=1000, ttl=SESSION_TTL):
+        self._cache = DataCache(store=None, ttl=ttl, max_memory=max_sessions)
+
+    def get(self, session_id):
+        return self._cache.get(session_id)
+
+    def set(self, session_id, state):
+        self._cache.set(session_id, state)
+
+    def delete(self, session_id):
+        self._cache.delete(session_id)
+
+
+class SQLiteSessionStore:
+    """
+    Session state in a SQLite file any worker can read.
+    No in-process layer on purpose: another worker may have updated the session since.
+    """
+
+    def __init__(self, path, max_sessions=10000, ttl=SESSION_TTL):
+        self._store = SQLiteStore(path, max_entries=max_sessions)
+        self.ttl = ttl
+
+    def get(self, session_id):
+        row = self._store.get(session_id)
+        return pickle.loads(row[0]) if row is not None else None
+
+    def set(self, session_id, state):
+        self._store.set(session_id, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), time.time() + self.ttl)
+
+    def delete(self, session_id):
+        self._store.delete(session_id)
+
+
+def make_session_store():
+    """Backend from AUTOMODELER_SESSION_BACKEND: 'memory' (default) or 'sqlite'"""
+    backend = os.environ.get('AUTOMODELER_SESSION_BACKEND', 'memory')
+    max_sessions = int(os.environ.get('AUTOMODELER_MAX_SESSIONS', 1000))
+    if backend == 'sqlite':
+        path = os.environ.get('AUTOMODELER_SESSION_DB', '.automodeler_sessions.sqlite')
+        return SQLiteSessionStore(path, max_sessions=max_sessions)
+    if backend != 'memory':
+        raise ValueError(f"Unknown session backend {backend!r}")
+    return MemorySessionStore(max_sessions=max_sessions)
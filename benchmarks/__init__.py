@@ -0,0 +1 @@
+"""Benchmarks for the modeling core and dashboard, run with python -m benchmarks.run"""
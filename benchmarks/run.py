@@ -0,0 +1,241 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import plotly.utils
+
+from automodeler import model
+from automodeler.batch import run_batch
+from benchmarks import startup
+from benchmarks.synthetic import VARIANTS, synth_statements, synthetic_provider, ticker_names
+
+"""
+Benchmark suite - synthetic statements through every hot path, results as JSON.
+
+    python -m benchmarks.run                              # writes bench_results.json
+    python -m benchmarks.run --quick -o new.json
+    python -m benchmarks.run --baseline old.json --tolerance 0.25   # exit 1 on regressions
+
+Timings are the median of --repeat runs. Run from the repo root.
+"""
+
+# Tabs built on the server, the chart tabs only cost series_payload (measured as 'charts')
+SERVER_TABS = ('tab-4', 'tab-5')
+# Result fields that identify a measurement (the rest are outputs)
+PARAMS = ('periods', 'variant', 'scenarios', 'tab', 'workers')
+
+
+def measure(fn, repeat):
+    """Median and min wall time of fn() over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'runs': repeat}
+
+
+def peak_memory(fn):
+    """Peak traced allocation of one fn() call, in bytes"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def json_size(obj):
+    return len(json.dumps(obj, cls=plotly.utils.PlotlyJSONEncoder).encode())
+
+
+def bench_normalize(periods, repeat):
+    """Provider round trip plus get_col scans and plugs, per period count and alias variant"""
+    results = []
+    for n in periods:
+        for variant in VARIANTS:
+            raw = synth_statements('BENCH', n, variant)
+            provider = synthetic_provider(['BENCH'], n, variant)
+            row = {'periods': n, 'variant': variant}
+            row['normalize'] = measure(lambda: model._normalize('BENCH', raw), repeat)
+            row['fetch_company_data'] = measure(
+                lambda: model.fetch_company_data('BENCH', use_cache=False, provider=provider), repeat)
+            results.append(row)
+    return results
+
+
+def bench_workbook(periods, repeat):
+    """generate_excel_file time, peak memory and file size versus period count"""
+    results = []
+    saved = model.default_provider
+    try:
+        for n in periods:
+            model.default_provider = synthetic_provider(['BENCH'], n)
+            for scenarios in (False, True):
+                run = lambda: model.generate_excel_file('BENCH', use_cache=False, scenarios=scenarios)
+                output, _, _ = run()
+                results.append({
+                    'periods': n,
+                    'scenarios': scenarios,
+                    'generate_excel_file': measure(run, repeat),
+                    'peak_bytes': peak_memory(run),
+                    'file_bytes': len(output.getvalue()),
+                })
+    finally:
+        model.default_provider = saved
+    return results
+
+
+def bench_tabs(periods, repeat):
+    """Server-side cost and wire size of each tab, the chart tabs share one series payload"""
+    from automodeler import app
+    results = []
+    for n in periods:
+        df, meta = model.fetch_company_data('BENCH', use_cache=False, provider=synthetic_provider(['BENCH'], n))
+        lines = app.model_lines(df)
+        proj = lines.iloc[len(df):]
+        results.append({
+            'periods': n,
+            'tab': 'charts',
+            'series_payload': measure(lambda: app.series_payload(df, proj), repeat),
+            'payload_bytes': json_size(app.series_payload(df, proj)),
+        })
+        for tab in SERVER_TABS:
+            results.append({
+                'periods': n,
+                'tab': tab,
+                'build_tab_content': measure(lambda: app.build_tab_content(tab, df, meta, lines), repeat),
+                'payload_bytes': json_size(app.build_tab_content(tab, df, meta, lines)),
+            })
+    return results
+
+
+def bench_batch(workers, tickers, latency):
+    """run_batch throughput versus worker count, provider latency simulates the network"""
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return {'skipped': 'needs the fork start method so workers inherit the synthetic provider'}
+    multiprocessing.set_start_method('fork', force=True)
+
+    names = ticker_names(tickers)
+    saved = model.default_provider
+    results = []
+    try:
+        model.default_provider = synthetic_provider(names, periods=5, latency=latency)
+        for w in workers:
+            with tempfile.TemporaryDirectory() as out_dir:
+                start = time.perf_counter()
+                records = run_batch(names, out_dir, workers=w, resume=False, use_cache=False)
+                elapsed = time.perf_counter() - start
+            failed = sum(1 for r in records if r['status'] != 'ok')
+            results.append({'workers': w, 'tickers': tickers, 'seconds': elapsed,
+                            'tickers_per_s': tickers / elapsed, 'failed': failed})
+    finally:
+        model.default_provider = saved
+    return {'latency_s': latency, 'runs': results}
+
+
+def _timings(results, prefix=''):
+    # Flatten results into {name: median seconds} for baseline comparisons
+    flat = {}
+    if isinstance(results, dict):
+        if 'median_s' in results:
+            flat[prefix] = results['median_s']
+        else:
+            for k, v in results.items():
+                flat.update(_timings(v, f'{prefix}.{k}' if prefix else k))
+    elif isinstance(results, list):
+        for row in results:
+            if not isinstance(row, dict):
+                continue
+            key = ','.join(f'{k}={row[k]}' for k in PARAMS if k in row)
+            for k, v in row.items():
+                if isinstance(v, dict) and 'median_s' in v:
+                    flat[f'{prefix}[{key}].{k}'] = v['median_s']
+            if 'workers' in row and row.get('seconds') is not None:
+                flat[f'{prefix}[{key}].seconds'] = row['seconds']  # batch wall time
+    return flat
+
+
+def compare(current, baseline, tolerance):
+    """Names of timings that got slower than baseline by more than tolerance (a fraction)"""
+    now, before = _timings(current['results']), _timings(baseline['results'])
+    regressions = []
+    for name, seconds in sorted(now.items()):
+        old = before.get(name)
+        # Sub-millisecond timings are too noisy to gate on
+        if old and max(old, seconds) > 0.001 and seconds > old * (1 + tolerance):
+            regressions.append({'name': name, 'baseline_s': old, 'current_s': seconds, 'ratio': seconds / old})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AutoModeler benchmarks")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="results file (default: bench_results.json)")
+    parser.add_argument('--quick', action='store_true', help="fewer sizes and repeats, for a smoke run")
+    parser.add_argument('--only', nargs='+', choices=('startup', 'normalize', 'workbook', 'tabs', 'batch'), help="run a subset")
+    parser.add_argument('--repeat', type=int, default=None, help="runs per timing (default 7, 2 with --quick)")
+    parser.add_argument('--baseline', default=None, help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown vs baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    repeat = args.repeat or (2 if args.quick else 7)
+    periods = (4, 20) if args.quick else (4, 10, 20, 40)
+    workers = (1, 4) if args.quick else (1, 2, 4, 8)
+    tickers = 16 if args.quick else 64
+    only = set(args.only or ('startup', 'normalize', 'workbook', 'tabs', 'batch'))
+
+    results = {}
+    if 'startup' in only:
+        results['startup'] = startup.run(runs=repeat)
+    if 'normalize' in only:
+        results['normalize'] = bench_normalize(periods, repeat)
+    if 'workbook' in only:
+        results['workbook'] = bench_workbook(periods, repeat)
+    if 'tabs' in only:
+        results['tabs'] = bench_tabs(periods, repeat)
+    if 'batch' in only:
+        results['batch'] = bench_batch(workers, tickers, latency=0.05)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+
+    for name, seconds in _timings(results).items():
+        print(f"{seconds * 1000:10.2f} ms  {name}")
+    for run in results.get('batch', {}).get('runs', []):
+        print(f"{run['tickers_per_s']:10.1f} /s  batch workers={run['workers']} ({run['failed']} failed)")
+    for problem in results.get('startup', {}).get('problems', []):
+        print(f"FAIL {problem}")
+    print(f"Results written to {args.output}")
+
+    failed = bool(results.get('startup', {}).get('problems'))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}: {r['baseline_s'] * 1000:.2f} ms -> {r['current_s'] * 1000:.2f} ms "
+                  f"({r['ratio']:.2f}x)")
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
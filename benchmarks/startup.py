@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+"""
+Start-up budget - how long a fresh interpreter takes to become useful.
+
+    python -m benchmarks.startup              # exit 1 if over budget
+    python -m benchmarks.startup --core-budget 0.8 --app-budget 2.0
+
+core: import the modeling core, what every batch worker pays on spawn
+app:  import the dashboard and call create_app(), what every gunicorn worker pays on boot
+Each is timed in its own subprocess, so nothing is already imported.
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, median of the runs. Generous enough for a shared CI box
+CORE_BUDGET = 1.0
+APP_BUDGET = 2.0
+
+# Slow to import and not needed until first use. Dash pulls in plotly itself,
+# so only the core can keep it out
+DEFERRED = {
+    'core': ('yfinance', 'xlsxwriter', 'plotly', 'dash'),
+    'app': ('yfinance', 'xlsxwriter'),
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+TARGETS = {
+    'core': "import automodeler.batch, automodeler.model, automodeler.refresh",
+    'app': "from automodeler.app import create_app; create_app()",
+}
+
+
+def probe(code, deferred, runs):
+    """Median import time of code across fresh interpreters, plus which deferred modules it pulled in"""
+    times, loaded = [], set()
+    env = dict(os.environ, AUTOMODELER_LOG_LEVEL='WARNING')
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(code=code, deferred=deferred)],
+                             cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        loaded.update(result['loaded'])
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'runs': runs,
+            'deferred_loaded': sorted(loaded)}
+
+
+def check(results, budgets):
+    """Budget and lazy-import violations, empty when everything is fine"""
+    problems = []
+    for name, budget in budgets.items():
+        r = results[name]
+        if r['median_s'] > budget:
+            problems.append(f"{name} start-up {r['median_s']:.2f}s is over its {budget:.2f}s budget")
+        if r['deferred_loaded']:
+            problems.append(f"{name} start-up imported {', '.join(r['deferred_loaded'])}")
+    return problems
+
+
+def run(runs=5, core_budget=CORE_BUDGET, app_budget=APP_BUDGET):
+    results = {name: probe(code, DEFERRED[name], runs) for name, code in TARGETS.items()}
+    results['budgets'] = {'core': core_budget, 'app': app_budget}
+    results['problems'] = check(results, results['budgets'])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure and assert the start-up time budget")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per target (default 5)")
+    parser.add_argument('--core-budget', type=float, default=CORE_BUDGET, help="seconds allowed for the core import")
+    parser.add_argument('--app-budget', type=float, default=APP_BUDGET, help="seconds allowed for create_app()")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.core_budget, args.app_budget)
+    for name in TARGETS:
+        print(f"{results[name]['median_s'] * 1000:10.1f} ms  {name} (budget {results['budgets'][name] * 1000:.0f} ms)")
+    for problem in results['problems']:
+        print(f"FAIL {problem}")
+    return 1 if results['problems'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from automodeler.providers import FakeProvider
+
+"""
+Synthetic yfinance-shaped statements for benchmarks.
+Period count and line item naming are configurable so every get_col alias path gets exercised.
+"""
+
+# Line item -> names yfinance has been seen to use, first is the usual one
+FINANCIALS = {
+    'Revenue': ['Total Revenue', 'TotalRevenue'],
+    'COGS': ['Cost Of Revenue', 'CostOfRevenue'],
+    'SG&A': ['Selling General And Administration', 'Operating Expense'],
+    'Interest': ['Interest Expense', 'InterestExpense'],
+    'Tax': ['Tax Provision', 'TaxProvision'],
+    'Net Income': ['Net Income', 'NetIncome'],
+}
+BALANCE_SHEET = {
+    'Cash': ['Cash And Cash Equivalents', 'CashAndCashEquivalents'],
+    'AR': ['Receivables', 'AccountsReceivable', 'NetReceivables'],
+    'PP&E': ['Net PPE', 'NetPPE', 'Gross PPE'],
+    'Total Assets': ['Total Assets', 'TotalAssets'],
+    'AP': ['Accounts Payable', 'AccountsPayable', 'Payables'],
+    'Debt': ['Total Debt', 'TotalDebt', 'Long Term Debt'],
+    'Total Liab': ['Total Liabilities Net Minority Interest', 'TotalLiabilities'],
+    'Share Capital': ['Common Stock', 'CommonStock', 'ShareIssued'],
+    'Retained Earnings': ['Retained Earnings', 'RetainedEarnings'],
+    'Total Equity': ['Stockholders Equity', 'StockholdersEquity'],
+}
+CASHFLOW = {
+    'D&A': ['Depreciation And Amortization', 'Depreciation'],
+    'Capex': ['Capital Expenditure', 'CapitalExpenditure'],
+    'Operating Cash Flow': ['Operating Cash Flow', 'OperatingCashFlow'],
+}
+
+# primary: first alias everywhere, alias: last alias (worst case for the scan),
+# sparse: a third of the items missing so get_col falls through to zeros
+VARIANTS = ('primary', 'alias', 'sparse')
+
+# Unrelated rows yfinance also returns, the normalizer has to skip past them
+NOISE_ROWS = 30
+
+
+def _frame(items, periods, variant, rng):
+    dates = pd.date_range(end='2024-12-31', periods=periods, freq='YE')[::-1]  # yfinance lists newest first
+    rows = {}
+    for i, (item, names) in enumerate(items.items()):
+        if variant == 'sparse' and i % 3 == 2:
+            continue
+        name = names[-1] if variant == 'alias' else names[0]
+        base = rng.uniform(1e8, 1e10)
+        rows[name] = base * rng.uniform(0.8, 1.2, periods)
+    for j in range(NOISE_ROWS):
+        rows[f'Other Item {j}'] = rng.uniform(1e6, 1e9, periods)
+    df = pd.DataFrame(rows, index=dates).T
+    df.iloc[:, -1] = np.where(rng.random(len(df)) < 0.1, np.nan, df.iloc[:, -1])  # oldest period is patchy
+    return df
+
+
+def synth_statements(ticker, periods=4, variant='primary', seed=0):
+    """{'financials', 'balance_sheet', 'cashflow', 'info'} for one ticker"""
+    rng = np.random.default_rng(seed)
+    return {
+        'financials': _frame(FINANCIALS, periods, variant, rng),
+        'balance_sheet': _frame(BALANCE_SHEET, periods, variant, rng),
+        'cashflow': _frame(CASHFLOW, periods, variant, rng),
+        'info': {'shortName': f'{ticker} Corp', 'sector': 'Technology', 'industry': 'Software',
+                 'currency': 'USD'},
+    }
+
+
+def synthetic_provider(tickers, periods=4, variant='primary', latency=0.0):
+    """FakeProvider serving synthetic statements for every ticker"""
+    return FakeProvider(
+        {t: synth_statements(t, periods, variant, seed=i) for i, t in enumerate(tickers)},
+        latency=latency,
+    )
+
+
+def ticker_names(n):
+    return [f'T{i:04d}' for i in range(n)]
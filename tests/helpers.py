@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+"""
+Shared test data - normalized statements in the shape fetch_company_data returns,
+and raw yfinance-shaped statements for providers.
+"""
+
+COLUMNS = ['Revenue', 'COGS', 'SG&A', 'Interest', 'Tax', 'Net Income', 'Cash', 'AR', 'PP&E',
+           'Total Assets', 'AP', 'Debt', 'Total Liab', 'Share Capital', 'Retained Earnings',
+           'Other Assets', 'Total Equity', 'Other Liab', 'D&A', 'Capex', 'Operating Cash Flow']
+
+
+def make_hist(periods=4, seed=0):
+    """Random annual history, one row per fiscal year end"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2020-12-31', periods=periods, freq='YE')
+    data = pd.DataFrame(rng.uniform(1e6, 1e9, (periods, len(COLUMNS))), index=index, columns=COLUMNS)
+    data['Capex'] *= -1
+    return data
+
+
+def edge_hist():
+    """Zero revenue, zero revenue the year before a period, zero pre-tax income and zero PP&E"""
+    data = make_hist(periods=5, seed=7)
+    data.loc[data.index[1], 'Revenue'] = 0.0
+    data.loc[data.index[3], 'PP&E'] = 0.0
+    last = data.index[-1]
+    data.loc[last, 'Interest'] = data.loc[last, 'Revenue'] - data.loc[last, 'COGS'] - data.loc[last, 'SG&A']
+    return data
+
+
+def raw_statements(periods=4, seed=0):
+    """yfinance-shaped statements (line items as rows, newest period first) for FakeProvider"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2020-12-31', periods=periods, freq='YE')[::-1]
+
+    def frame(items):
+        return pd.DataFrame(rng.uniform(1e6, 1e9, (len(items), periods)), index=items, columns=dates)
+
+    return {
+        'financials': frame(['Total Revenue', 'Cost Of Revenue', 'Selling General And Administration',
+                             'Interest Expense', 'Tax Provision', 'Net Income']),
+        'balance_sheet': frame(['Cash And Cash Equivalents', 'Receivables', 'Net PPE', 'Total Assets',
+                                'Accounts Payable', 'Total Debt', 'Total Liabilities Net Minority Interest',
+                                'Common Stock', 'Retained Earnings', 'Stockholders Equity']),
+        'cashflow': frame(['Depreciation And Amortization', 'Capital Expenditure', 'Operating Cash Flow']),
+        'info': {'shortName': 'Test Co', 'sector': 'Testing', 'industry': 'Fixtures', 'currency': 'USD'},
+    }
@@ -0,0 +1,54 @@
+import sqlite3
+
+from automodeler.cache import DataCache, SQLiteStore
+
+"""
+Data cache - the disk store's eviction order has to follow hits served from memory too.
+"""
+
+
+def test_memory_hits_keep_entries_on_disk(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'cache.sqlite'), max_entries=3)
+    cache = DataCache(store, touch_interval=0)
+    cache.set('HOT', 'hot')
+    for key in ('A', 'B'):
+        cache.set(key, key)
+    assert cache.get('HOT') == 'hot'  # served from memory, written back to the store
+    cache.set('C', 'c')  # one over max_entries
+
+    assert store.get('HOT') is not None
+    assert store.get('A') is None
+    assert cache.stats()['memory_hits'] == 1
+
+
+def test_memory_hits_are_written_back_in_batches(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'cache.sqlite'))
+    cache = DataCache(store, touch_interval=3600)
+    cache.set('A', 'a')
+    with sqlite3.connect(store.path) as conn:
+        before = conn.execute("SELECT accessed FROM entries").fetchone()[0]
+    cache.get('A')
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute("SELECT accessed FROM entries").fetchone()[0] == before
+
+
+def test_store_closes_its_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    class Tracked(sqlite3.Connection):
+        def close(self):
+            opened.remove(self)
+            super().close()
+
+    def tracked(*args, **kwargs):
+        conn = connect(*args, factory=Tracked, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', tracked)
+    store = SQLiteStore(str(tmp_path / 'cache.sqlite'))
+    store.set('A', b'a', expires=2e9)
+    store.get('A')
+    store.touch(['A'], 1.0)
+    assert not opened
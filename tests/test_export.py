@@ -0,0 +1,104 @@
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+
+from automodeler import export, model
+from automodeler.cache import DataCache
+from automodeler.export import stream_pack, write_pack
+from automodeler.providers import FakeProvider
+from tests.helpers import raw_statements
+
+"""
+Model packs - archive contents, the manifest and how many tickers are built at once.
+"""
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider({t: raw_statements(seed=i) for i, t in enumerate(['AAA', 'BBB', 'CCC', 'DDD', 'EEE'])})
+    monkeypatch.setattr(model, 'default_provider', fake)
+    monkeypatch.setattr(model, 'data_cache', DataCache())  # keep fake statements out of the real cache file
+    return fake
+
+
+def manifest(archive):
+    return [json.loads(line) for line in archive.read('manifest.jsonl').decode().splitlines()]
+
+
+def test_pack_holds_every_file_and_a_manifest_with_failures(provider):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as archive:
+        records = list(write_pack(archive, ['AAA', 'NOPE', 'BBB'], workers=2, use_cache=False, data_format='csv'))
+
+    with zipfile.ZipFile(buf) as archive:
+        names = set(archive.namelist())
+        for t in ('AAA', 'BBB'):
+            assert {f"{t}_Model.xlsx", f"data/historical/{t}.csv", f"data/drivers/{t}.csv",
+                    f"data/projections/{t}.csv"} <= names
+        assert not any('NOPE' in n for n in names)
+        written = {r['ticker']: r for r in manifest(archive)}
+
+    assert written.keys() == {'AAA', 'NOPE', 'BBB'}
+    assert written['NOPE']['status'] == 'failed' and "Can't find NOPE" in written['NOPE']['error']
+    assert written['AAA']['status'] == 'ok' and written['AAA']['files'][0] == 'AAA_Model.xlsx'
+    assert [r['ticker'] for r in records] == [r['ticker'] for r in written.values()]
+
+
+def test_builds_at_most_workers_tickers_at_once(provider, monkeypatch):
+    build = export._build_entry
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def tracked(*args):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        try:
+            time.sleep(0.05)
+            return build(*args)
+        finally:
+            with lock:
+                state['running'] -= 1
+
+    monkeypatch.setattr(export, '_build_entry', tracked)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as archive:
+        for _ in write_pack(archive, ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'], workers=2, use_cache=False):
+            time.sleep(0.05)  # slow consumer: nothing new starts until a result is taken
+    assert state['peak'] == 2
+
+
+def test_stream_pack_streams_a_valid_zip(provider):
+    chunks = list(stream_pack(['AAA', 'BBB', 'CCC'], workers=1, use_cache=False))
+    assert len(chunks) > 1  # one per finished ticker, then the manifest
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert [r['ticker'] for r in manifest(archive)] == ['AAA', 'BBB', 'CCC']
+
+
+def test_bad_format_fails_before_any_fetch(provider):
+    with pytest.raises(ValueError):
+        stream_pack(['AAA'], data_format='xls')
+    assert sum(provider.calls.values()) == 0
+
+
+def test_export_route_is_capped_and_one_at_a_time(provider, monkeypatch):
+    from automodeler import app as dashboard
+    monkeypatch.setattr(dashboard, 'EXPORT_MAX_TICKERS', 2)
+    client = dashboard.create_app().server.test_client()
+
+    assert client.get('/export?tickers=AAA,BBB,CCC').status_code == 400
+    assert client.get('/export?tickers=AAA&data=xls').status_code == 400
+
+    first = client.get('/export?tickers=AAA,NOPE', buffered=False)
+    assert first.status_code == 200
+    assert client.get('/export?tickers=BBB').status_code == 429
+    with zipfile.ZipFile(io.BytesIO(first.get_data())) as archive:
+        statuses = {r['ticker']: r['status'] for r in manifest(archive)}
+    assert statuses == {'AAA': 'ok', 'NOPE': 'failed'}
+    first.close()  # frees the slot
+    assert client.get('/export?tickers=BBB').status_code == 200
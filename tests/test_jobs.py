@@ -0,0 +1,211 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from automodeler import jobs, model
+from automodeler.cache import BytesLRU, DataCache
+from automodeler.jobs import JOB_STALE, JobQueue, JobStore, generate_job
+from automodeler.providers import FakeProvider
+from tests.helpers import raw_statements
+
+"""
+Background jobs - dedup, cancel, dead owners and pool failures, run in-process with fake pools.
+"""
+
+STAGES = ['fetching', 'projecting', 'running scenarios', 'building workbook', 'building scenario workbook']
+
+
+class FakePool:
+    """Stands in for ProcessPoolExecutor, submit raises the queued errors first"""
+
+    created = []
+
+    def __init__(self, *args, errors=(), **kwargs):
+        self.errors = list(errors)
+        self.futures = []
+        FakePool.created.append(self)
+
+    def submit(self, fn, *args):
+        if self.errors:
+            raise self.errors.pop(0)
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider({'AAA': raw_statements()})
+    monkeypatch.setattr(model, 'default_provider', fake)
+    # Keep the job's results out of the real cache files
+    monkeypatch.setattr(model, 'data_cache', DataCache())
+    monkeypatch.setattr(model, 'artifact_cache', DataCache())
+    monkeypatch.setattr(model, 'workbook_cache', BytesLRU())
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.sqlite'))
+
+
+@pytest.fixture
+def queue(store, monkeypatch):
+    FakePool.created = []
+    monkeypatch.setattr(jobs, 'ProcessPoolExecutor', FakePool)
+    q = JobQueue(store)
+    yield q
+    q.shutdown()
+
+
+def backdate(store, job_id, column, seconds):
+    with sqlite3.connect(store.path) as conn:
+        conn.execute(f"UPDATE jobs SET {column} = {column} - ? WHERE id = ?", (seconds, job_id))
+
+
+def test_job_builds_everything_in_stages(store, provider, monkeypatch):
+    stages = []
+    update = JobStore.update
+
+    def record(self, job_id, **fields):
+        if 'stage' in fields:
+            stages.append(fields['stage'])
+        update(self, job_id, **fields)
+
+    monkeypatch.setattr(JobStore, 'update', record)
+    job_id, _ = store.create('AAA', 'web-1')
+    generate_job(store.path, job_id)
+    assert stages == STAGES + ['done']
+    assert store.get(job_id)['progress'] == 1.0
+
+    # The web worker only reads what the job left behind
+    def no_build(*args, **kwargs):
+        raise AssertionError("built in the web worker")
+
+    monkeypatch.setattr(model, 'build_workbook', no_build)
+    monkeypatch.setattr(model, 'model_lines', no_build)
+    monkeypatch.setattr(model, 'run_scenarios', no_build)
+    df, meta = model.fetch_company_data('AAA')
+    assert model.workbook_bytes(df, meta, scenarios=True)[:2] == b'PK'
+    assert model.workbook_bytes(df, meta, scenarios=False)[:2] == b'PK'
+    assert len(model.projected_lines(df, meta)) == len(df) + 5
+    assert set(model.scenario_bands(df, meta)) == {'Revenue', 'Net Income', 'Retained Earnings'}
+    assert sum(provider.calls.values()) == 4
+
+
+def test_failed_fetch_fails_the_job(store, provider):
+    job_id, _ = store.create('NOPE', 'web-1')
+    generate_job(store.path, job_id)
+    job = store.get(job_id)
+    assert job['status'] == 'failed' and "Can't find NOPE" in job['error']
+
+
+def test_active_jobs_are_deduplicated(store):
+    first, created = store.create('AAA', 'web-1')
+    assert created
+    assert store.create('AAA', 'web-2') == (first, False)  # any worker reuses it
+    assert store.create('BBB', 'web-1')[0] != first
+
+    store.update(first, status='done')
+    second, created = store.create('AAA', 'web-1')
+    assert created and second != first
+
+    store.cancel(second)
+    assert store.get(second)['status'] == 'cancelled'
+    assert store.create('AAA', 'web-1')[1]
+
+
+def test_queued_job_waiting_long_is_still_alive(store):
+    # Its owner keeps beating, how long ago it was queued doesn't matter
+    job_id, _ = store.create('AAA', 'web-1')
+    backdate(store, job_id, 'updated', 3600)
+    store.beat('web-1')
+    assert store.get(job_id)['status'] == 'queued'
+    assert store.create('AAA', 'web-2') == (job_id, False)
+
+
+def test_jobs_of_a_dead_owner_are_not_reused(store, queue):
+    # Web worker restarted with the row still queued
+    stranded, _ = store.create('AAPL', 'gone')
+    backdate(store, stranded, 'heartbeat', JOB_STALE + 1)
+    assert store.get(stranded)['status'] == 'failed'
+    assert store.status(stranded) == 'queued'
+
+    job_id = queue.submit('AAPL')
+    assert job_id != stranded
+    assert store.get(job_id)['status'] == 'queued'
+
+
+def test_cancelled_queued_job_never_runs(store, provider):
+    job_id, _ = store.create('AAA', 'web-1')
+    store.cancel(job_id)
+    generate_job(store.path, job_id)
+    assert store.get(job_id)['status'] == 'cancelled'
+    assert sum(provider.calls.values()) == 0
+
+
+def test_cancel_stops_a_running_fetch(store, provider):
+    provider.latency = 2.0
+    job_id, _ = store.create('AAA', 'web-1')
+    worker = threading.Thread(target=generate_job, args=(store.path, job_id))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while store.get(job_id)['stage'] != 'fetching' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    start = time.monotonic()
+    store.cancel(job_id)
+    worker.join()
+    assert time.monotonic() - start < 1.0
+    assert store.get(job_id)['status'] == 'cancelled'
+
+
+def test_submit_error_fails_the_row(store, queue, monkeypatch):
+    monkeypatch.setattr(queue, '_get_pool', lambda: FakePool(errors=[RuntimeError("cannot schedule new futures")]))
+    job_id = queue.submit('AAA')
+    job = store.get(job_id)
+    assert job['status'] == 'failed' and 'cannot schedule' in job['error']
+    assert store.create('AAA', 'web-2')[1]  # not reused
+
+
+def test_broken_pool_is_replaced_on_submit(store, queue):
+    queue._pool = FakePool(errors=[BrokenProcessPool("child died")])
+    job_id = queue.submit('AAA')
+    assert store.get(job_id)['status'] == 'queued'
+    assert len(FakePool.created) == 2 and queue._pool is FakePool.created[1]
+    assert len(FakePool.created[1].futures) == 1
+
+
+def test_dead_job_process_fails_the_row_and_drops_the_pool(store, queue):
+    job_id = queue.submit('AAA')
+    pool = queue._pool
+    pool.futures[0].set_exception(BrokenProcessPool("child died"))
+    job = store.get(job_id)
+    assert job['status'] == 'failed' and 'child died' in job['error']
+    assert queue._pool is None
+
+    queue.submit('AAA')
+    assert queue._pool is not pool
+
+
+def test_finished_job_is_not_failed_afterwards(store, queue):
+    job_id = queue.submit('AAA')
+    store.update(job_id, status='done', stage='done')
+    queue._pool.futures[0].set_exception(BrokenProcessPool("child died after finishing"))
+    assert store.get(job_id)['status'] == 'done'
+
+
+def test_queue_heartbeat_keeps_its_jobs_alive(store, queue, monkeypatch):
+    monkeypatch.setattr(jobs, 'JOB_HEARTBEAT', 0.02)
+    job_id = queue.submit('AAA')
+    backdate(store, job_id, 'heartbeat', JOB_STALE + 1)
+    deadline = time.monotonic() + 2
+    while store.get(job_id)['status'] != 'queued' and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert store.get(job_id)['status'] == 'queued'
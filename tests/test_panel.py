@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from automodeler.panel import PanelStore, fiscal_year
+from tests.helpers import make_hist
+
+"""
+Panel store period axis - one row per reported period end, whatever the fiscal calendar.
+"""
+
+
+def dated(periods, seed=0):
+    data = make_hist(periods=len(periods), seed=seed)
+    data.index = pd.to_datetime(periods)
+    return data
+
+
+def test_fiscal_year():
+    assert fiscal_year('2024-12-31') == 2024
+    assert fiscal_year('2024-06-30') == 2024
+    assert fiscal_year('2024-01-31') == 2023
+
+
+def test_quarterly_history_keeps_every_period(tmp_path):
+    quarters = ['2023-03-31', '2023-06-30', '2023-09-30', '2023-12-31', '2024-03-31']
+    hist = dated(quarters, seed=1)
+    store = PanelStore(str(tmp_path))
+    store.append({'QQQ': hist})
+
+    panel = store.load()
+    assert panel.periods == quarters
+    back = panel.frame('QQQ')
+    assert len(back) == 5
+    np.testing.assert_array_equal(back['Revenue'].to_numpy(), hist['Revenue'].to_numpy())
+
+
+def test_off_calendar_fiscal_years(tmp_path):
+    store = PanelStore(str(tmp_path))
+    dec = dated(['2022-12-31', '2023-12-31'], seed=2)
+    jan = dated(['2023-01-31', '2024-01-31'], seed=3)
+    store.append({'DEC': dec, 'JAN': jan})
+    panel = store.load()
+
+    fy2023 = panel.cross_section(2023)
+    assert fy2023.loc['DEC', 'Revenue'] == dec['Revenue'].iloc[1]
+    assert fy2023.loc['JAN', 'Revenue'] == jan['Revenue'].iloc[1]  # year ending January 2024
+
+    exact = panel.cross_section('2024-01-31')
+    assert np.isnan(exact.loc['DEC', 'Revenue'])
+    assert exact.loc['JAN', 'Revenue'] == jan['Revenue'].iloc[1]
+
+    # Growth compares each ticker's own last two periods, not neighbouring columns
+    growth = panel.revenue_growth()
+    assert growth['DEC'] == pytest.approx(dec['Revenue'].iloc[1] / dec['Revenue'].iloc[0] - 1)
+    assert growth['JAN'] == pytest.approx(jan['Revenue'].iloc[1] / jan['Revenue'].iloc[0] - 1)
+    assert panel.latest('Revenue')['DEC'] == dec['Revenue'].iloc[1]
+
+
+def test_duplicate_period_is_rejected(tmp_path):
+    store = PanelStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.append({'DUP': dated(['2023-12-31', '2023-12-31'])})
+
+
+def test_new_periods_keep_existing_tickers(tmp_path):
+    store = PanelStore(str(tmp_path))
+    first = dated(['2022-12-31', '2023-12-31'], seed=4)
+    store.append({'AAA': first})
+    store.append({'BBB': dated(['2023-09-30', '2024-09-30'], seed=5)})
+    panel = store.load()
+    assert panel.periods == ['2022-12-31', '2023-09-30', '2023-12-31', '2024-09-30']
+    np.testing.assert_array_equal(panel.frame('AAA')['Revenue'].to_numpy(), first['Revenue'].to_numpy())
+
+
+def test_new_period_switches_values_file_with_the_index(tmp_path):
+    store = PanelStore(str(tmp_path))
+    first = dated(['2022-12-31', '2023-12-31'], seed=6)
+    store.append({'AAA': first})
+    before = PanelStore(str(tmp_path)).load()
+
+    store.append({'BBB': dated(['2024-06-30'], seed=7)})
+    # A reader that mapped the old file keeps a consistent view
+    np.testing.assert_array_equal(before.frame('AAA')['Revenue'].to_numpy(), first['Revenue'].to_numpy())
+    assert sorted(p.name for p in tmp_path.glob('values*')) == ['values.2.f64']
+
+
+def test_readers_keep_the_old_layout_until_the_index_moves(tmp_path, monkeypatch):
+    store = PanelStore(str(tmp_path))
+    first = dated(['2022-12-31', '2023-12-31'], seed=8)
+    store.append({'AAA': first})
+
+    def crash():
+        raise OSError("disk full")
+
+    # Writer dies after rewriting the values for a new period, before the index is replaced
+    monkeypatch.setattr(store, '_write_index', crash)
+    with pytest.raises(OSError):
+        store.append({'AAA': dated(['2022-12-31', '2023-12-31', '2024-12-31'], seed=9)})
+
+    panel = PanelStore(str(tmp_path)).load()
+    assert panel.periods == ['2022-12-31', '2023-12-31']
+    np.testing.assert_array_equal(panel.frame('AAA')['Revenue'].to_numpy(), first['Revenue'].to_numpy())
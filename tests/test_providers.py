@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from automodeler import model
+from automodeler.providers import (STATEMENTS, FakeProvider, FetchCancelled, FetchError, RateLimitedProvider,
+                                   SharedTokenBucket, SingleFlight, TokenBucket, fetch_statements)
+from tests.helpers import raw_statements
+
+"""
+Fetch coalescing and upstream rate limiting, against a call-counting FakeProvider.
+"""
+
+
+class FlakyProvider(FakeProvider):
+    """Raises the queued errors one call at a time, then serves the statements"""
+
+    def __init__(self, statements, errors):
+        super().__init__(statements)
+        self.errors = list(errors)
+
+    def _get(self, name, ticker):
+        with self._lock:
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            self.calls[name] += 1
+            raise error
+        return super()._get(name, ticker)
+
+
+def run_threads(n, fn):
+    barrier = threading.Barrier(n)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_fetches_make_one_call_per_statement():
+    provider = FakeProvider({'AAA': raw_statements()}, latency=0.2)
+    results, errors = run_threads(8, lambda: model.fetch_company_data('AAA', provider=provider))
+    assert not errors
+    assert len(results) == 8
+    assert provider.calls == {name: 1 for name in STATEMENTS}
+    # Every caller gets its own copy
+    assert len({id(df) for df, _ in results}) == 8
+
+
+def test_single_flight_error_reaches_every_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        # Fail only once every other caller is waiting on this execution
+        deadline = time.monotonic() + 5
+        while flight.counters['shared'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results, errors = run_threads(5, lambda: flight.do('key', fn))
+    assert calls == [1]
+    assert not results
+    assert len(errors) == 5 and all(isinstance(e, ValueError) for e in errors)
+    assert flight.counters == {'executed': 1, 'shared': 4}
+
+
+def test_single_flight_runs_again_after_completion():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.do('key', lambda: 2) == 2
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    start = time.monotonic()
+    for _ in range(3):
+        assert bucket.acquire()
+    assert time.monotonic() - start < 0.05
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.15  # 4 more tokens at 20/s
+
+
+def test_token_bucket_gives_up_at_timeout():
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert bucket.acquire(timeout=0.05) is False
+    assert time.monotonic() - start < 0.05  # knows up front the token won't come in time
+
+
+def test_shared_token_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'rate.sqlite')
+    a = SharedTokenBucket(path, rate=1, capacity=2)
+    b = SharedTokenBucket(path, rate=1, capacity=2)
+    assert a.acquire(timeout=0)
+    assert b.acquire(timeout=0)
+    assert a.acquire(timeout=0.1) is False
+    assert b.acquire(timeout=0.1) is False
+
+
+def test_no_upstream_calls_after_the_fetch_gives_up():
+    provider = FakeProvider({f'T{i}': raw_statements(seed=i) for i in range(6)})
+    limited = RateLimitedProvider(provider, TokenBucket(rate=4, capacity=4))
+
+    def fetch(ticker):
+        try:
+            fetch_statements(limited, ticker, timeout=0.5)
+        except FetchError:
+            pass
+
+    threads = [threading.Thread(target=fetch, args=(f'T{i}',)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    made = sum(provider.calls.values())
+    time.sleep(1.0)
+    assert sum(provider.calls.values()) == made
+    assert made <= 4 + 4 * 0.5 + 1
+
+
+def test_deadline_that_cannot_be_met_skips_the_call():
+    provider = FakeProvider({'AAA': raw_statements()})
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+    limited = RateLimitedProvider(provider, bucket)
+    with pytest.raises(FetchError):
+        limited.call('financials', 'AAA', deadline=time.monotonic() + 0.1)
+    assert provider.calls['financials'] == 0
+
+
+def test_transient_errors_are_retried():
+    provider = FlakyProvider({'AAA': raw_statements()}, [ConnectionError("reset"), TimeoutError("slow")])
+    limited = RateLimitedProvider(provider, TokenBucket(rate=100), retries=3, backoff=0)
+    assert not limited.financials('AAA').empty
+    assert provider.calls['financials'] == 3
+
+
+def test_other_errors_are_not_retried():
+    provider = FlakyProvider({'AAA': raw_statements()}, [KeyError("no such line")])
+    limited = RateLimitedProvider(provider, TokenBucket(rate=100), retries=3, backoff=0)
+    with pytest.raises(KeyError):
+        limited.financials('AAA')
+    assert provider.calls['financials'] == 1
+
+
+def test_cancelled_fetch_stops_waiting():
+    provider = FakeProvider({'AAA': raw_statements()}, latency=2.0)
+    start = time.monotonic()
+    with pytest.raises(FetchCancelled):
+        fetch_statements(provider, 'AAA', timeout=10, cancelled=lambda: time.monotonic() - start > 0.2)
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,138 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from automodeler import model
+from automodeler.batch import model_path
+from automodeler.providers import FakeProvider
+from automodeler.refresh import diff, fingerprint, refresh_ticker
+from tests.helpers import make_hist, raw_statements
+
+"""
+Incremental refresh - change classification and the probe-or-fetch decision, in-process
+against a FakeProvider.
+"""
+
+META = {'name': 'Test Co', 'sector': 'Testing', 'industry': 'Fixtures', 'currency': 'USD'}
+
+
+def with_new_period(raw):
+    """Same statements plus a newer fiscal year"""
+    out = dict(raw)
+    for name in ('financials', 'balance_sheet', 'cashflow'):
+        frame = raw[name]
+        newest = frame.iloc[:, [0]] * 1.1
+        newest.columns = [frame.columns[0] + pd.DateOffset(years=1)]
+        out[name] = pd.concat([newest, frame], axis=1)
+    return out
+
+
+def restated(raw, period='2022-12-31'):
+    out = dict(raw)
+    out['financials'] = raw['financials'].copy()
+    out['financials'].loc['Total Revenue', pd.Timestamp(period)] *= 1.05
+    return out
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider({'AAA': raw_statements()})
+    monkeypatch.setattr(model, 'default_provider', fake)
+    return fake
+
+
+def reset_calls(provider):
+    provider.calls = {name: 0 for name in provider.calls}
+
+
+def test_diff_classifies_changes():
+    hist = make_hist(periods=4, seed=1)
+    old = fingerprint(hist, META)
+    assert diff(None, old) == {'new_ticker': True}
+    assert diff(old, fingerprint(hist.copy(), dict(META))) == {}
+
+    longer = pd.concat([hist, make_hist(periods=5, seed=2).iloc[[-1]]])
+    assert diff(old, fingerprint(longer, META)) == {'new_periods': ['2024-12-31']}
+
+    changed = hist.copy()
+    changed.loc[changed.index[1], 'Revenue'] *= 1.05
+    assert diff(old, fingerprint(changed, META)) == {'restated': ['2021-12-31']}
+
+    missing = hist.copy()
+    missing['Interest'] = 0.0
+    assert diff(fingerprint(missing, META), old)['new_items'] == ['Interest']
+
+    assert diff(old, fingerprint(hist, dict(META, name='Renamed Co'))) == {'other': True}
+
+
+def test_first_run_builds_the_workbook(tmp_path, provider):
+    record, state, df = refresh_ticker('AAA', str(tmp_path), None)
+    assert record['status'] == 'rebuilt' and record['changes'] == {'new_ticker': True}
+    assert os.path.exists(model_path(str(tmp_path), 'AAA'))
+    assert state['latest_period'] == '2023-12-31'
+    assert df is not None
+
+
+def test_unchanged_latest_period_skips_the_fetch(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    reset_calls(provider)
+
+    record, new_state, df = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'unchanged'
+    assert new_state is None and df is None
+    assert provider.calls == {'financials': 1, 'balance_sheet': 0, 'cashflow': 0, 'info': 0}
+
+
+def test_missing_workbook_forces_a_full_check(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    os.remove(model_path(str(tmp_path), 'AAA'))
+    record, _, _ = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'rebuilt' and record['changes'] == {'missing_workbook': True}
+
+
+def test_new_period_is_caught_by_the_probe(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    provider.statements['AAA'] = with_new_period(provider.statements['AAA'])
+
+    record, new_state, df = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'rebuilt'
+    assert record['changes'] == {'new_periods': ['2024-12-31']}
+    assert new_state['latest_period'] == '2024-12-31'
+    assert len(df) == 5
+
+
+def test_restatement_waits_for_the_full_check(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    provider.statements['AAA'] = restated(provider.statements['AAA'])
+
+    # Same latest period and a recent full check: the probe can't see a restatement
+    record, _, _ = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'unchanged'
+
+    state['checked'] = time.time() - 8 * 86400
+    record, new_state, df = refresh_ticker('AAA', str(tmp_path), state, full_check_days=7)
+    assert record['status'] == 'rebuilt'
+    assert record['changes'] == {'restated': ['2022-12-31']}
+    assert new_state['checked'] > state['checked']
+
+
+def test_full_check_without_changes_keeps_the_workbook(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    path = model_path(str(tmp_path), 'AAA')
+    built = os.path.getmtime(path)
+    state['checked'] = 0
+
+    record, new_state, df = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'unchanged'
+    assert new_state is not None and df is None  # checked time moves on
+    assert os.path.getmtime(path) == built
+
+
+def test_failed_probe_is_reported(tmp_path, provider):
+    _, state, _ = refresh_ticker('AAA', str(tmp_path), None)
+    del provider.statements['AAA']
+    record, new_state, _ = refresh_ticker('AAA', str(tmp_path), state)
+    assert record['status'] == 'failed' and "Can't find AAA" in record['error']
+    assert new_state is None